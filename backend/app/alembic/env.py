@@ -27,6 +27,11 @@ fileConfig(config.config_file_name) # type: ignore
 from app.models.user import SQLModel  # noqa
 from app.models.omdb_movie import SQLModel # noqa
 from app.models.user_movie import SQLModel # noqa
+from app.models.recommendation import SQLModel # noqa
+from app.models.popularity import SQLModel # noqa
+from app.models.rating import SQLModel # noqa
+from app.models.ingestion import SQLModel # noqa
+from app.models.facet import SQLModel # noqa
 
 target_metadata = SQLModel.metadata
 
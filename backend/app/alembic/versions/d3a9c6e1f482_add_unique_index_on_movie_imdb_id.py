@@ -0,0 +1,127 @@
+"""add unique index on movie.imdb_id
+
+Revision ID: d3a9c6e1f482
+Revises: b58e0f3a1d27
+Create Date: 2026-10-18 14:02:11.904415
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd3a9c6e1f482'
+down_revision: Union[str, None] = 'b58e0f3a1d27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 之前重复运行导入脚本会产生 imdb_id 相同的电影：每组保留 id 最小的一条，
+    # 点赞、评分和汇总数据都转到保留的那条上，之后再删除其余重复行（否则会被级联删除）
+    op.execute(
+        """
+        CREATE TEMP TABLE movie_duplicate ON COMMIT DROP AS
+        SELECT id, keep FROM (
+            SELECT id, min(id) OVER (PARTITION BY imdb_id) AS keep FROM movie
+        ) AS m
+        WHERE id <> keep
+        """
+    )
+    op.execute(
+        """
+        UPDATE usermovie SET movies = ARRAY(
+            SELECT coalesce(d.keep, liked.movie_id)
+            FROM unnest(usermovie.movies) WITH ORDINALITY AS liked(movie_id, position)
+            LEFT JOIN movie_duplicate AS d ON d.id = liked.movie_id
+            GROUP BY 1
+            ORDER BY min(liked.position)
+        )
+        WHERE movies && ARRAY(SELECT id FROM movie_duplicate)
+        """
+    )
+
+    # 重复电影上的评分转到保留的电影：同一个用户评过同一组里的多部时保留最近的一条，
+    # 已经评过保留的那部时保留原来的评分
+    op.execute(
+        """
+        CREATE TEMP TABLE rating_duplicate ON COMMIT DROP AS
+        SELECT r.owner_id, d.keep, r.score, r.updated_at
+        FROM rating AS r JOIN movie_duplicate AS d ON d.id = r.movie_id
+        """
+    )
+    op.execute("CREATE TEMP TABLE rating_carried (movie_id integer, score integer) ON COMMIT DROP")
+    op.execute(
+        """
+        WITH carried AS (
+            INSERT INTO rating (owner_id, movie_id, score, updated_at)
+            SELECT DISTINCT ON (owner_id, keep) owner_id, keep, score, updated_at
+            FROM rating_duplicate
+            ORDER BY owner_id, keep, updated_at DESC
+            ON CONFLICT (owner_id, movie_id) DO NOTHING
+            RETURNING movie_id, score
+        )
+        INSERT INTO rating_carried SELECT movie_id, score FROM carried
+        """
+    )
+    # 汇总里还有从旧的 movie.ratings 迁移来的匿名评分，不能只按 rating 表重算：
+    # 合并整组的直方图，减去重复电影上的评分，再加上实际转过来的评分
+    op.execute(
+        """
+        WITH buckets AS (
+            SELECT k.keep, b.bucket,
+                   coalesce((
+                       SELECT sum(s.histogram[b.bucket]) FROM movieratingstats AS s
+                       WHERE s.movie_id = k.keep
+                          OR s.movie_id IN (SELECT id FROM movie_duplicate WHERE keep = k.keep)
+                   ), 0)
+                   - (SELECT count(*) FROM rating_duplicate AS r WHERE r.keep = k.keep AND r.score = b.bucket)
+                   + (SELECT count(*) FROM rating_carried AS c WHERE c.movie_id = k.keep AND c.score = b.bucket)
+                   AS n
+            FROM (
+                SELECT DISTINCT d.keep FROM movie_duplicate AS d
+                JOIN movieratingstats AS s ON s.movie_id IN (d.id, d.keep)
+            ) AS k
+            CROSS JOIN generate_series(1, 10) AS b(bucket)
+        )
+        INSERT INTO movieratingstats (movie_id, rating_count, rating_sum, histogram, average)
+        SELECT keep, sum(n), sum(n * bucket), array_agg(n::integer ORDER BY bucket),
+               CASE WHEN sum(n) > 0 THEN sum(n * bucket)::float / sum(n)::float END
+        FROM buckets
+        GROUP BY keep
+        ON CONFLICT (movie_id) DO UPDATE
+        SET rating_count = excluded.rating_count,
+            rating_sum = excluded.rating_sum,
+            histogram = excluded.histogram,
+            average = excluded.average
+        """
+    )
+    # 点赞已经转到保留的电影，重新统计它们的点赞数；重复电影的趋势热度随行删除
+    op.execute(
+        """
+        INSERT INTO moviepopularity (movie_id, like_count, trending_score, genres, updated_at)
+        SELECT movie.id,
+               (SELECT count(*) FROM usermovie WHERE movie.id = ANY(usermovie.movies)),
+               NULL,
+               coalesce(regexp_split_to_array(nullif(movie.genre, ''), '\\s*,\\s*'), '{}'),
+               now() at time zone 'utc'
+        FROM movie
+        WHERE movie.id IN (SELECT keep FROM movie_duplicate)
+          AND EXISTS (SELECT 1 FROM usermovie WHERE movie.id = ANY(usermovie.movies))
+        ON CONFLICT (movie_id) DO UPDATE SET like_count = excluded.like_count
+        """
+    )
+    op.execute("DELETE FROM movie WHERE id IN (SELECT id FROM movie_duplicate)")
+
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.create_index(op.f('ix_movie_imdb_id'), 'movie', ['imdb_id'], unique=True)
+    # ### end Alembic commands ###
+
+
+def downgrade() -> None:
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.drop_index(op.f('ix_movie_imdb_id'), table_name='movie')
+    # ### end Alembic commands ###
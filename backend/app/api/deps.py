@@ -41,11 +41,8 @@ SessionDep = Annotated[Session, Depends(get_db)]
 TokenDep = Annotated[str, Depends(reusable_oauth2)]
 
 
-#解码并验证 JWT 令牌。
-#提取用户 ID（sub）并从数据库中获取用户。
-#检查用户是否存在且活跃。
-#返回用户对象，如果验证失败或用户无效则抛出 HTTP 异常。
-def get_current_user(session: SessionDep, token: TokenDep) -> User:
+#解码并验证 JWT 令牌，验证失败时抛出 HTTP 异常。
+def decode_token(token: str) -> TokenPayload:
     try:
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[security.ALGORITHM]
@@ -56,6 +53,15 @@ def get_current_user(session: SessionDep, token: TokenDep) -> User:
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Could not validate credentials",
         )
+    return token_data
+
+
+#解码并验证 JWT 令牌。
+#提取用户 ID（sub）并从数据库中获取用户。
+#检查用户是否存在且活跃。
+#返回用户对象，如果验证失败或用户无效则抛出 HTTP 异常。
+def get_current_user(session: SessionDep, token: TokenDep) -> User:
+    token_data = decode_token(token)
     user = session.get(User, token_data.sub)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
@@ -67,6 +73,21 @@ def get_current_user(session: SessionDep, token: TokenDep) -> User:
 #使用 Annotated 结合 Depends(get_current_user)，定义当前用户依赖项。
 CurrentUser = Annotated[User, Depends(get_current_user)]
 
+
+#只验证 JWT 令牌并返回用户 ID，不查询数据库。
+#用于不需要完整用户对象、且希望热路径上不访问 Postgres 的接口。
+def get_current_user_id(token: TokenDep) -> int:
+    token_data = decode_token(token)
+    if token_data.sub is None:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Could not validate credentials",
+        )
+    return token_data.sub
+
+
+CurrentUserId = Annotated[int, Depends(get_current_user_id)]
+
 #检查当前用户是否为超级用户。
 #如果不是超级用户，抛出 HTTP 异常。
 #如果是超级用户，返回当前用户对象。
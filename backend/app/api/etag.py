@@ -0,0 +1,43 @@
+"""
+条件 GET：响应带 ETag，客户端（或 CDN）下次请求时通过 If-None-Match 带回，
+内容没有变化就返回 304，不再生成和传输响应体。
+
+电影的 ETag 由 id 和 version 组成，version 在电影每次被修改时加一（见 Movie.version），
+所以判断一部电影有没有变化只需要读取这一列。
+"""
+import hashlib
+from typing import Any
+
+from fastapi import Request, Response
+from pydantic_core import to_json
+
+# 需要登录才能访问的资源：只能由客户端自己缓存，每次使用前都要用 ETag 验证
+PRIVATE_CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts: Any) -> str:
+    """
+    Strong ETag derived from everything the response body depends on
+    """
+    return f'"{hashlib.sha1(to_json(parts)).hexdigest()}"'
+
+
+def movie_etag(movie_id: int, version: int) -> str:
+    return f'"movie-{movie_id}-{version}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """
+    Whether the request's If-None-Match already has this ETag
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match 使用弱比较，W/ 前缀不影响匹配
+    return etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+
+
+def not_modified(headers: dict[str, str]) -> Response:
+    return Response(status_code=304, headers=headers)
@@ -9,6 +9,7 @@ from fastapi import APIRouter
 from app.api.routes import (
     movies,
     login,
+    posters,
     users,
     user_movie,
     utils,
@@ -26,6 +27,7 @@ api_router.include_router(users.router, prefix="/users", tags=["用户 - users"]
 # Movie 
 api_router.include_router(movies.router, prefix="/movies", tags=["movies"])
 api_router.include_router(user_movie.router, prefix="/user_movie", tags=["user_movie"])
+api_router.include_router(posters.router, prefix="/posters", tags=["posters"])
 
 # Other 
 api_router.include_router(utils.router, prefix="/utils", tags=["utils"])
\ No newline at end of file
@@ -0,0 +1,72 @@
+"""
+列表接口的游标（keyset）分页：游标记录上一页最后一行的排序键和 id，下一页用
+(排序键, id) > (上次的值, 上次的 id) 直接在 (列, id) 索引上定位，不需要跳过前面的行，
+翻到多深的页面成本都和第一页相同。
+
+游标对客户端是不透明的字符串（URL 安全的 base64 JSON），只能原样传回。
+"""
+import base64
+import binascii
+import json
+import math
+from typing import Any
+
+from fastapi import HTTPException
+from sqlalchemy import ColumnElement, SQLColumnExpression, tuple_
+
+# 游标里的值最终作为查询参数和 integer/bigint 列比较，超出范围时 Postgres 会报错
+MAX_ID = 2**31 - 1
+MAX_BIGINT = 2**63 - 1
+
+
+def encode_cursor(sort: str, order: str, value: Any, last_id: int) -> str:
+    payload = json.dumps({"s": sort, "o": order, "v": value, "id": last_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def _is_valid_value(value: Any, value_type: type) -> bool:
+    # null：上一页最后一行的排序列为 NULL（这些行排在最后）
+    if value is None:
+        return True
+    # JSON 里的 true/false 解析为 bool，而 bool 是 int 的子类
+    if isinstance(value, bool):
+        return False
+    if value_type is float:
+        return isinstance(value, int | float) and math.isfinite(value)
+    return isinstance(value, int) and -MAX_BIGINT <= value <= MAX_BIGINT
+
+
+def decode_cursor(cursor: str, sort: str, order: str, value_type: type) -> tuple[Any, int]:
+    """
+    Return (last sort value, last id) from a cursor; 400 if it is malformed, from another
+    sort order, or its values do not fit the sort column (value_type is int or float)
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        value, last_id = payload["v"], payload["id"]
+        matches = payload["s"] == sort and payload["o"] == order
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not matches:
+        raise HTTPException(status_code=400, detail="Cursor does not match sort and order")
+    valid_id = isinstance(last_id, int) and not isinstance(last_id, bool) and 0 <= last_id <= MAX_ID
+    if not valid_id or not _is_valid_value(value, value_type):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return value, last_id
+
+
+def after_cursor(
+    sort_column: SQLColumnExpression[Any],
+    id_column: SQLColumnExpression[Any],
+    order: str,
+    value: Any,
+    last_id: int,
+) -> ColumnElement[bool]:
+    """
+    Condition selecting the rows after (value, last_id) in the given order
+    """
+    if sort_column is id_column:
+        return id_column > last_id if order == "asc" else id_column < last_id
+    # 行比较可以直接用 (列, id) 的组合索引
+    key = tuple_(sort_column, id_column)
+    return key > (value, last_id) if order == "asc" else key < (value, last_id)
@@ -1,49 +1,298 @@
-from typing import Any
+from collections.abc import Sequence
+from typing import Annotated, Any, Literal
 
-from fastapi import APIRouter, HTTPException, Query
-from sqlmodel import func, select
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from pydantic import Field
+from sqlalchemy import SQLColumnExpression, false
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import col, func, select
 
-from app.api.deps import CurrentUser, SessionDep
+from app.api.deps import (
+    CurrentUser,
+    CurrentUserId,
+    SessionDep,
+    get_current_user,
+    get_current_user_id,
+)
+from app.api.etag import (
+    PRIVATE_CACHE_CONTROL,
+    etag_matches,
+    make_etag,
+    movie_etag,
+    not_modified,
+)
+from app.api.pagination import after_cursor, decode_cursor, encode_cursor
+from app.core.config import settings
 from app.models.omdb_movie import (
+    MOVIE_CARD_FIELDS,
+    SEARCH_CONFIG,
     Movie,
     MovieCreateIn,
+    MoviePartialOut,
     MoviePublicOut,
+    MoviesPartialOut,
     MoviesPublicOut,
     MovieUpdateIn,
+    SimilarMovieOut,
+    SimilarMoviesOut,
+    movie_search_vector,
 )
 
+from app.models.facet import FACET_KINDS
+from app.models.rating import MovieRatingStatsOut, RatingIn, RatingPublicOut
+from app.models.recommendation import UserRecommendation
 from app.models.user import Message
-from app.crud.movies import read_movies_by_ids
+from app.models.user_movie import UserMovie
+from app.crud.counts import CountMode, count_rows, invalidate_counts
+from app.crud.facets import has_facet, read_facet_counts, read_facet_ids, sync_movie_facets
+from app.crud.movies import read_movies_by_ids, read_movies_in_order
+from app.crud.popularity import read_popular_movie_ids, read_trending_movie_ids
+from app.crud.ratings import (
+    rate_movie,
+    read_rating_stats,
+    read_top_rated_movie_ids,
+    unrate_movie,
+)
+from app.recommender.ann import get_movie_index
+from app.recommender.cache import recommendation_cache
+from app.recommender.cooccurrence import get_cooccurrence_model
 
 router = APIRouter()
 
-@router.get("/", response_model=MoviesPublicOut)
+# sort 参数 -> (排序列, 游标里的值的类型)；数值列都有 (列, id) 索引，正向/反向扫描都能直接给出结果，不需要排序
+SORT_COLUMNS: dict[str, tuple[str, type]] = {
+    "id": ("id", int),
+    "year": ("year_num", int),
+    "runtime": ("runtime_num", int),
+    "imdb_rating": ("imdb_rating_num", float),
+    "imdb_votes": ("imdb_votes_num", int),
+    "metascore": ("metascore_num", int),
+    "box_office": ("box_office_num", int),
+}
+
+# 完整的列表和 fields 选择部分列的列表；按顺序校验，完整结果不会再按 MoviesPartialOut 校验一遍
+MovieListOut = Annotated[MoviesPublicOut | MoviesPartialOut, Field(union_mode="left_to_right")]
+
+
+def parse_fields(fields: str) -> list[str]:
+    """
+    Column names from a comma separated fields parameter; "card" expands to the list card columns
+    """
+    names: list[str] = []
+    for name in fields.split(","):
+        name = name.strip()
+        names.extend(MOVIE_CARD_FIELDS if name == "card" else [name])
+    unknown = [name for name in names if name not in MoviePartialOut.model_fields]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    return list(dict.fromkeys(names))
+
+
+@router.get("/", response_model=MovieListOut)
 def read_movies(
-    session: SessionDep, current_user: CurrentUser, skip: int = 0, limit: int = 100
+    session: SessionDep,
+    current_user: CurrentUser,
+    request: Request,
+    response: Response,
+    skip: int = 0,
+    limit: int = Query(default=100, ge=1, le=1000),
+    cursor: str | None = None,
+    count_mode: CountMode = "cached",
+    sort: Literal["id", "year", "runtime", "imdb_rating", "imdb_votes", "metascore", "box_office"] = "id",
+    order: Literal["asc", "desc"] = "asc",
+    year_min: int | None = None,
+    year_max: int | None = None,
+    runtime_min: int | None = None,
+    runtime_max: int | None = None,
+    rating_min: float | None = Query(default=None, ge=0, le=10),
+    rating_max: float | None = Query(default=None, ge=0, le=10),
+    votes_min: int | None = None,
+    metascore_min: int | None = Query(default=None, ge=0, le=100),
+    genre: list[str] = Query(default=[]),
+    language: list[str] = Query(default=[]),
+    country: list[str] = Query(default=[]),
+    include_facets: bool = False,
+    facet_limit: int = Query(default=20, ge=1, le=200),
+    fields: str | None = None,
 ) -> Any:
     """
-    Retrieve Movies
+    Retrieve Movies, optionally filtered by numeric ranges and sorted by a numeric field.
+    genre/language/country can be repeated; a movie must have every value given.
+    include_facets=true also returns, per facet kind, the most common values among the matching movies.
+    Movies without a value for the sort field come last, ordered by id.
+    Pass the returned next_cursor as cursor to get the next page (skip is then ignored);
+    count_mode chooses how the total is computed: exact, cached, estimate (planner statistics,
+    only for the unfiltered full catalog) or none.
+    fields selects the returned columns, e.g. fields=card or fields=id,title,plot;
+    only those columns are read from the database and present in each movie.
+    Responses carry an ETag; with a matching If-None-Match the answer is 304 Not Modified.
     """
-    if current_user.is_superuser:
-        count_statement = select(func.count()).select_from(Movie)
-        count = session.exec(count_statement).one()
-        statement = select(Movie).offset(skip).limit(limit)
-        movies = session.exec(statement).all()
+    conditions = []
+    if not current_user.is_superuser:
+        conditions.append(col(Movie.owner_id) == current_user.id)
+    ranges = [
+        (Movie.year_num, year_min, year_max),
+        (Movie.runtime_num, runtime_min, runtime_max),
+        (Movie.imdb_rating_num, rating_min, rating_max),
+        (Movie.imdb_votes_num, votes_min, None),
+        (Movie.metascore_num, metascore_min, None),
+    ]
+    for column, low, high in ranges:
+        if low is not None:
+            conditions.append(col(column) >= low)
+        if high is not None:
+            conditions.append(col(column) <= high)
+    wanted = [
+        (kind, name)
+        for kind, names in (("genre", genre), ("language", language), ("country", country))
+        for name in names
+    ]
+    if wanted:
+        facet_ids = read_facet_ids(session, wanted)
+        if facet_ids is None:
+            # 不存在的分面取值，不可能有匹配的电影；仍然走下面的正常流程（count_mode、fields、ETag），
+            # 条件为 false 的查询 Postgres 不需要扫描任何数据
+            conditions.append(false())
+        else:
+            conditions.extend(has_facet(facet_id) for facet_id in facet_ids)
+
+    sort_key, value_type = SORT_COLUMNS[sort]
+    id_column: SQLColumnExpression[Any] = col(Movie.id)
+    sort_column: SQLColumnExpression[Any] = id_column if sort == "id" else getattr(Movie, sort_key)
+
+    def ordered(*columns: Any) -> list[Any]:
+        return [c.desc() for c in columns] if order == "desc" else list(columns)
+
+    count = count_rows(session, Movie, conditions, count_mode)
+
+    selected = None if fields is None else parse_fields(fields)
+    # 带 If-None-Match 的请求先只查询生成 ETag 需要的列，客户端的缓存仍然有效时不读取整行
+    revalidating = "if-none-match" in request.headers
+    # id 和排序列用于生成游标，version 用于生成 ETag，没有选择时也要查询，但不返回
+    key_columns = ["id", "version", sort_key]
+    if revalidating:
+        statement = select(*(getattr(Movie, name) for name in dict.fromkeys(key_columns)))
+    elif selected is None:
+        statement = select(Movie)
     else:
-        count_statement = (
-            select(func.count())
-            .select_from(Movie)
-            .where(Movie.owner_id == current_user.id)
-        )
-        count = session.exec(count_statement).one()
-        statement = (
-            select(Movie)
-            .where(Movie.owner_id == current_user.id)
-            .offset(skip)
-            .limit(limit)
+        columns = dict.fromkeys([*key_columns, *selected])
+        statement = select(*(getattr(Movie, name) for name in columns))
+    statement = statement.where(*conditions)
+    value: Any = None
+    last_id = 0
+    if cursor is not None:
+        value, last_id = decode_cursor(cursor, sort, order, value_type)
+    # 多取一行判断是否还有下一页
+    if sort == "id":
+        page = statement.order_by(*ordered(id_column))
+        if cursor is not None:
+            page = page.where(after_cursor(id_column, id_column, order, last_id, last_id))
+        else:
+            page = page.offset(skip)
+        movies = list(session.exec(page.limit(limit + 1)).all())
+    else:
+        # 排序列为 NULL 的电影（升序、降序都）排在最后，按 id 排序：先在 (列, id) 索引上取有值的行，
+        # 不够一页时再取 NULL 的行，两段都能直接用索引；游标的值为 null 表示已经翻到 NULL 的部分
+        movies = []
+        if cursor is None or value is not None:
+            page = statement.where(sort_column.is_not(None)).order_by(*ordered(sort_column, id_column))
+            if cursor is not None:
+                page = page.where(after_cursor(sort_column, id_column, order, value, last_id))
+            else:
+                page = page.offset(skip)
+            movies = list(session.exec(page.limit(limit + 1)).all())
+        if len(movies) <= limit:
+            page = statement.where(sort_column.is_(None)).order_by(*ordered(id_column))
+            if cursor is not None and value is None:
+                page = page.where(after_cursor(id_column, id_column, order, last_id, last_id))
+            elif cursor is None and not movies and skip > 0:
+                # skip 越过了所有有值的行，只有这时才需要知道跳过了多少行有值的电影
+                with_value = session.exec(
+                    select(func.count()).select_from(Movie).where(*conditions, sort_column.is_not(None))
+                ).one()
+                page = page.offset(max(skip - with_value, 0))
+            movies.extend(session.exec(page.limit(limit + 1 - len(movies))).all())
+    next_cursor = None
+    if len(movies) > limit:
+        movies = movies[:limit]
+        last = movies[-1]
+        value = getattr(last, sort_key)
+        next_cursor = encode_cursor(sort, order, value, last.id)
+    facets = read_facet_counts(session, conditions, facet_limit) if include_facets else None
+
+    def page_etag(rows: Sequence[Any]) -> str:
+        # 查询参数决定返回哪些列，(id, version) 决定每部电影的内容
+        rows_versions = [(row.id, row.version) for row in rows]
+        return make_etag(str(request.url.query), rows_versions, count, next_cursor, facets)
+
+    headers = {"ETag": page_etag(movies), "Cache-Control": PRIVATE_CACHE_CONTROL}
+    if etag_matches(request, headers["ETag"]):
+        return not_modified(headers)
+    if revalidating:
+        # 缓存已过期，按 id 读取这一页的完整内容；期间有电影被修改时 ETag 以读到的内容为准
+        ids = [row.id for row in movies]
+        if selected is None:
+            statement = select(Movie)
+        else:
+            columns = dict.fromkeys(["id", "version", *selected])
+            statement = select(*(getattr(Movie, name) for name in columns))
+        by_id = {row.id: row for row in session.exec(statement.where(col(Movie.id).in_(ids))).all()}
+        movies = [by_id[movie_id] for movie_id in ids if movie_id in by_id]
+        headers["ETag"] = page_etag(movies)
+
+    if selected is None:
+        response.headers.update(headers)
+        return MoviesPublicOut(data=movies, count=count, next_cursor=next_cursor, facets=facets)
+    data = [MoviePartialOut(**{name: getattr(row, name) for name in selected}) for row in movies]
+    partial = MoviesPartialOut(data=data, count=count, next_cursor=next_cursor, facets=facets)
+    # 只序列化选择的列；直接返回 JSON，不再按 MoviesPublicOut 校验一遍
+    return Response(
+        content=partial.model_dump_json(exclude_unset=True),
+        media_type="application/json",
+        headers=headers,
+    )
+
+
+@router.get("/search", response_model=MoviesPublicOut)
+def search_movies(
+    session: SessionDep,
+    current_user: CurrentUser,
+    q: str = Query(min_length=1, max_length=200),
+    skip: int = Query(default=0, ge=0),
+    limit: int = Query(default=20, ge=1, le=100),
+    count_mode: CountMode = "cached",
+) -> Any:
+    """
+    Full-text search over title, director, actors, genre and plot, best matches first.
+    q supports web search syntax: "quoted phrases", OR, -excluded.
+    Every match is ranked, but only the best SEARCH_MAX_CANDIDATES can be paged through:
+    skip + limit may not exceed it (400 otherwise) and count is capped at it.
+    """
+    if skip + limit > settings.SEARCH_MAX_CANDIDATES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"skip + limit must not exceed {settings.SEARCH_MAX_CANDIDATES}",
         )
+    ts_query = func.websearch_to_tsquery(SEARCH_CONFIG, q)
+    conditions = [movie_search_vector.op("@@")(ts_query)]
+    if not current_user.is_superuser:
+        conditions.append(col(Movie.owner_id) == current_user.id)
 
-        movies = session.exec(statement).all()
+    count = count_rows(session, Movie, conditions, count_mode)
+    # 只有前 SEARCH_MAX_CANDIDATES 条匹配能翻页得到，总数也只报告这么多
+    if count is not None:
+        count = min(count, settings.SEARCH_MAX_CANDIDATES)
+    # 对所有匹配的行计算相关度后再取当前页，最相关的结果不会因为扫描顺序被漏掉；
+    # offset + limit 不超过 SEARCH_MAX_CANDIDATES，排序只需保留这么多行（top-N 堆排序）
+    rank = func.ts_rank(movie_search_vector, ts_query)
+    statement = (
+        select(Movie)
+        .where(*conditions)
+        .order_by(rank.desc(), col(Movie.id))
+        .offset(skip)
+        .limit(limit)
+    )
+    movies = session.exec(statement).all()
 
     return MoviesPublicOut(data=movies, count=count)
 
@@ -58,19 +307,201 @@ def read_liked_movies(session: SessionDep, current_user: CurrentUser) -> Any:
     return movies
 
 
+@router.get("/recommendations", response_model=MoviesPublicOut)
+def read_recommended_movies(
+    session: SessionDep,
+    current_user_id: CurrentUserId,
+    k: int = Query(default=10, ge=1, le=100),
+) -> Any:
+    """
+    Recommend top-k movies the current user has not liked yet
+    """
+    # 缓存命中时只验证 token，不访问模型和数据库
+    cached = recommendation_cache.get(current_user_id, k)
+    if cached is not None:
+        cached_k, movies = cached
+        if cached_k == k:
+            return movies
+        return MoviesPublicOut(data=movies.data[:k], count=len(movies.data[:k]))
+
+    # 优先读取离线预计算的结果（一次主键查询），没有时再用共现模型在线计算
+    precomputed = session.get(UserRecommendation, current_user_id)
+    if precomputed is not None:
+        ids = precomputed.movies[:k]
+    else:
+        user_movie = session.get(UserMovie, current_user_id)
+        liked = user_movie.movies if user_movie else []
+        ids = get_cooccurrence_model(session).recommend(liked, k)
+        # 冷启动：没有点赞或共现模型给不出结果时推荐最受欢迎的电影
+        if not ids:
+            ids = read_popular_movie_ids(session, k, exclude=liked)
+
+    movies = read_movies_in_order(session, ids)
+    recommendation_cache.put(current_user_id, k, movies)
+    return movies
+
+
+@router.get(
+    "/popular",
+    dependencies=[Depends(get_current_user)],
+    response_model=MoviesPublicOut,
+)
+def read_popular_movies(
+    session: SessionDep,
+    k: int = Query(default=10, ge=1, le=100),
+    genre: str | None = None,
+) -> Any:
+    """
+    Most liked movies, optionally within one genre
+    """
+    ids = read_popular_movie_ids(session, k, genre=genre)
+    return read_movies_in_order(session, ids)
+
+
+@router.get(
+    "/trending",
+    dependencies=[Depends(get_current_user)],
+    response_model=MoviesPublicOut,
+)
+def read_trending_movies(
+    session: SessionDep,
+    k: int = Query(default=10, ge=1, le=100),
+    genre: str | None = None,
+) -> Any:
+    """
+    Movies with the most like activity recently
+    """
+    ids = read_trending_movie_ids(session, k, genre=genre)
+    return read_movies_in_order(session, ids)
+
+
+@router.get(
+    "/top-rated",
+    dependencies=[Depends(get_current_user)],
+    response_model=MoviesPublicOut,
+)
+def read_top_rated_movies(
+    session: SessionDep,
+    k: int = Query(default=10, ge=1, le=100),
+    min_count: int = Query(default=1, ge=1),
+) -> Any:
+    """
+    Movies with the highest average rating
+    """
+    ids = read_top_rated_movie_ids(session, k, min_count=min_count)
+    return read_movies_in_order(session, ids)
+
+
 @router.get("/{id}", response_model=MoviePublicOut)
-def read_movie(session: SessionDep, current_user: CurrentUser, id: int) -> Any:
+def read_movie(
+    session: SessionDep, current_user: CurrentUser, request: Request, response: Response, id: int
+) -> Any:
     """
-    Get Movie by ID.
+    Get Movie by ID. Returns 304 Not Modified when If-None-Match has the current ETag.
     """
+    if "if-none-match" in request.headers:
+        # 只读取 version 和 owner_id 判断客户端的缓存是否有效，有效时不加载和序列化整行
+        row = session.exec(
+            select(Movie.owner_id, Movie.version).where(Movie.id == id)
+        ).first()
+        if row is not None and (current_user.is_superuser or row.owner_id == current_user.id):
+            etag = movie_etag(id, row.version)
+            if etag_matches(request, etag):
+                return not_modified({"ETag": etag, "Cache-Control": PRIVATE_CACHE_CONTROL})
     movie = session.get(Movie, id)
     if not movie:
         raise HTTPException(status_code=404, detail="Movie Not found")
     if not current_user.is_superuser and (movie.owner_id != current_user.id):
         raise HTTPException(status_code=400, detail="Not enough permissions")
+    response.headers["ETag"] = movie_etag(id, movie.version)
+    response.headers["Cache-Control"] = PRIVATE_CACHE_CONTROL
     return movie
 
 
+@router.get(
+    "/{id}/similar",
+    dependencies=[Depends(get_current_user_id)],
+    response_model=SimilarMoviesOut,
+)
+def read_similar_movies(
+    id: int,
+    k: int = Query(default=10, ge=1, le=100),
+    n_probe: int | None = Query(default=None, ge=1),
+) -> Any:
+    """
+    Get movies with similar content from the ANN index, without touching the database
+    """
+    index = get_movie_index()
+    if index is None:
+        raise HTTPException(status_code=503, detail="Similarity index not built")
+    similar = index.similar(id, k, n_probe=n_probe)
+    if similar is None:
+        raise HTTPException(status_code=404, detail="Movie Not found")
+    data = [SimilarMovieOut(id=movie_id, score=score) for movie_id, score in similar]
+    return SimilarMoviesOut(movie_id=id, data=data, count=len(data))
+
+
+@router.get(
+    "/{id}/rating",
+    dependencies=[Depends(get_current_user)],
+    response_model=MovieRatingStatsOut,
+)
+def read_movie_rating(session: SessionDep, id: int) -> Any:
+    """
+    Get the rating count, average and histogram of a Movie
+    """
+    if not session.get(Movie, id):
+        raise HTTPException(status_code=404, detail="Movie Not found")
+    return read_rating_stats(session, id)
+
+
+@router.put("/{id}/rating", response_model=RatingPublicOut)
+def update_movie_rating(
+    *, session: SessionDep, current_user: CurrentUser, id: int, rating_in: RatingIn
+) -> Any:
+    """
+    Rate a Movie, replacing the current user's previous rating
+    """
+    # 写操作需要加载用户，已删除或停用的用户的令牌不能再写入评分
+    if not session.get(Movie, id):
+        raise HTTPException(status_code=404, detail="Movie Not found")
+    return rate_movie(
+        session=session, owner_id=current_user.id, movie_id=id, score=rating_in.score
+    )
+
+
+@router.delete("/{id}/rating")
+def delete_movie_rating(session: SessionDep, current_user: CurrentUser, id: int) -> Message:
+    """
+    Remove the current user's rating of a Movie
+    """
+    if not unrate_movie(session=session, owner_id=current_user.id, movie_id=id):
+        raise HTTPException(status_code=404, detail="Rating not found")
+    return Message(message="Rating deleted successfully")
+
+
+# imdb_id 的唯一索引；先查询再写入之间可能有并发请求写入同一个 imdb_id，提交时仍可能冲突
+IMDB_ID_INDEX = "ix_movie_imdb_id"
+DUPLICATE_IMDB_ID = "The movie with this imdb_id already exists"
+
+
+def commit_movie(session: SessionDep, movie: Movie, sync_facets: bool) -> None:
+    """
+    Write a created or changed movie; 400 if its imdb_id was taken concurrently
+    """
+    try:
+        session.flush()
+        if sync_facets:
+            sync_movie_facets(session, [movie.id])  # type: ignore[list-item]
+        session.commit()
+    except IntegrityError as e:
+        session.rollback()
+        diag = getattr(e.orig, "diag", None)
+        if diag is None or diag.constraint_name != IMDB_ID_INDEX:
+            raise
+        raise HTTPException(status_code=400, detail=DUPLICATE_IMDB_ID)
+
+
 @router.post("/", response_model=MoviePublicOut)
 def create_movie(
     *, session: SessionDep, current_user: CurrentUser, movie_in: MovieCreateIn
@@ -78,9 +509,13 @@ def create_movie(
     """
     Create new Movie.
     """
+    existing = session.exec(select(Movie.id).where(Movie.imdb_id == movie_in.imdb_id)).first()
+    if existing is not None:
+        raise HTTPException(status_code=400, detail=DUPLICATE_IMDB_ID)
     movie = Movie.model_validate(movie_in, update={"owner_id": current_user.id})
     session.add(movie)
-    session.commit()
+    commit_movie(session, movie, sync_facets=True)
+    invalidate_counts(Movie)
     session.refresh(movie)
     return movie
 
@@ -97,9 +532,22 @@ def update_movie(
     if not current_user.is_superuser and (movie.owner_id != current_user.id):
         raise HTTPException(status_code=400, detail="Not enough permissions")
     update_dict = movie_in.model_dump(exclude_unset=True)
+    if "imdb_id" in update_dict and update_dict["imdb_id"] != movie.imdb_id:
+        existing = session.exec(
+            select(Movie.id).where(Movie.imdb_id == update_dict["imdb_id"], Movie.id != id)
+        ).first()
+        if existing is not None:
+            raise HTTPException(status_code=400, detail=DUPLICATE_IMDB_ID)
+    if "poster" in update_dict and update_dict["poster"] != movie.poster:
+        update_dict["poster_key"] = None
+    # 内容没有变化时保留原来的 version，客户端缓存的 ETag 仍然有效
+    if any(getattr(movie, key) != value for key, value in update_dict.items()):
+        update_dict["version"] = movie.version + 1
     movie.sqlmodel_update(update_dict)
     session.add(movie)
-    session.commit()
+    commit_movie(session, movie, sync_facets=any(kind in update_dict for kind in FACET_KINDS))
+    # 数值列可能变化，按范围筛选的计数也随之变化
+    invalidate_counts(Movie)
     session.refresh(movie)
     return movie
 
@@ -115,4 +563,5 @@ def delete_movie(session: SessionDep, current_user: CurrentUser, id: int) -> Mes
         raise HTTPException(status_code=400, detail="Not enough permissions")
     session.delete(movie)
     session.commit()
+    invalidate_counts(Movie)
     return Message(message="Movie deleted successfully")
\ No newline at end of file
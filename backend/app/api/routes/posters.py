@@ -0,0 +1,27 @@
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.responses import FileResponse
+
+from app.api.etag import etag_matches, not_modified
+from app.core.posters import KEY_PATTERN, POSTER_MEDIA_TYPE, POSTER_SIZES, poster_store
+
+router = APIRouter()
+
+# 缩略图按内容寻址，同一个 URL 的内容永远不会变化
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+@router.get("/{key}/{size}", response_class=FileResponse)
+def read_poster(request: Request, key: str, size: str) -> Response:
+    """
+    Get a poster thumbnail. Public, since <img> cannot send the bearer token.
+    """
+    if size not in POSTER_SIZES or not KEY_PATTERN.match(key):
+        raise HTTPException(status_code=404, detail="Poster not found")
+    etag = f'"{key}-{size}"'
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if etag_matches(request, etag):
+        return not_modified(headers)
+    path = poster_store.path_for(key, size)
+    if not path.is_file():
+        raise HTTPException(status_code=404, detail="Poster not found")
+    return FileResponse(path, media_type=POSTER_MEDIA_TYPE, headers=headers)
@@ -1,7 +1,7 @@
 from typing import Any
 
 from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import col, delete, func, select
+from sqlmodel import col, delete, select
 
 from app.api.deps import (
     CurrentUser,
@@ -11,6 +11,7 @@ from app.api.deps import (
 from app.core.config import settings
 from app.core.security import get_password_hash, verify_password
 from app.crud import users
+from app.crud.counts import CountMode, count_rows, invalidate_counts
 from app.models.omdb_movie import Movie
 from app.models.user import (
     Message,
@@ -33,13 +34,14 @@ router = APIRouter()
     dependencies=[Depends(get_current_active_superuser)],
     response_model=UsersPublic,
 )
-def read_users(session: SessionDep, skip: int = 0, limit: int = 100) -> Any:
+def read_users(
+    session: SessionDep, skip: int = 0, limit: int = 100, count_mode: CountMode = "cached"
+) -> Any:
     """
     Retrieve users.
     """
 
-    count_statement = select(func.count()).select_from(User)
-    count = session.exec(count_statement).one()
+    count = count_rows(session, User, [], count_mode)
 
     statement = select(User).offset(skip).limit(limit)
     users = session.exec(statement).all()
@@ -137,6 +139,8 @@ def delete_user_me(session: SessionDep, current_user: CurrentUser) -> Any:
     session.exec(statement)  # type: ignore
     session.delete(current_user)
     session.commit()
+    invalidate_counts(User)
+    invalidate_counts(Movie)
     return Message(message="User deleted successfully")
 
 
@@ -229,4 +233,6 @@ def delete_user(
     session.exec(statement)  # type: ignore
     session.delete(user)
     session.commit()
+    invalidate_counts(User)
+    invalidate_counts(Movie)
     return Message(message="User deleted successfully")
\ No newline at end of file
@@ -2,7 +2,11 @@ from fastapi import APIRouter, Depends
 from pydantic.networks import EmailStr
 
 from app.api.deps import get_current_active_superuser
+from app.core.engine import engine, pool_stats
+from app.models.monitoring import DbPoolStats
+from app.models.recommendation import RecommendationCacheStats
 from app.models.user import Message
+from app.recommender.cache import recommendation_cache
 from app.utils import generate_test_email, send_email
 
 router = APIRouter()
@@ -23,4 +27,28 @@ def test_email(email_to: EmailStr) -> Message:
         subject=email_data.subject,
         html_content=email_data.html_content,
     )
-    return Message(message="Test email sent")
\ No newline at end of file
+    return Message(message="Test email sent")
+
+
+@router.get(
+    "/recommendation-cache/",
+    dependencies=[Depends(get_current_active_superuser)],
+    response_model=RecommendationCacheStats,
+)
+def read_recommendation_cache_stats() -> RecommendationCacheStats:
+    """
+    Hit/miss/eviction counters of this worker's recommendation cache.
+    """
+    return recommendation_cache.stats()
+
+
+@router.get(
+    "/db-pool/",
+    dependencies=[Depends(get_current_active_superuser)],
+    response_model=DbPoolStats,
+)
+def read_db_pool_stats() -> DbPoolStats:
+    """
+    Connection pool utilisation of this worker process.
+    """
+    return DbPoolStats(**pool_stats(engine))
@@ -0,0 +1,235 @@
+"""
+生成基准测试用的合成数据：user、movie、usermovie，点赞分布服从 Zipf 分布（少数电影占大部分点赞）。
+
+    python -m app.benchmark.generate_data --users 100000 --movies 200000 --likes-per-user 20
+    python -m app.benchmark.generate_data --clean
+
+数据用 COPY 批量写入，生成的用户邮箱为 bench-<n>@example.com、电影 imdb_id 以 tb 开头，
+--clean 只删除这些数据。超级用户也会分到一份点赞列表，供 app.benchmark.run 压测 /movies/liked。
+"""
+import argparse
+import logging
+import time
+from collections.abc import Iterable, Iterator, Sequence
+
+import numpy as np
+from sqlmodel import Session, col, delete, select
+
+from app.core.config import settings
+from app.core.db import engine
+from app.core.security import get_password_hash
+from app.crud.facets import sync_movie_facets
+from app.crud.popularity import refresh_like_counts
+from app.models.omdb_movie import Movie
+from app.models.user import User
+from app.models.user_movie import UserMovie
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+EMAIL_PATTERN = "bench-{}@example.com"
+IMDB_ID_PREFIX = "tb"
+# 每次 COPY 写入的行数
+COPY_BATCH_SIZE = 10_000
+
+GENRES = [
+    "Action", "Adventure", "Animation", "Biography", "Comedy", "Crime", "Documentary",
+    "Drama", "Family", "Fantasy", "History", "Horror", "Music", "Mystery", "Romance",
+    "Sci-Fi", "Sport", "Thriller", "War", "Western",
+]
+LANGUAGES = ["English", "French", "Spanish", "German", "Japanese", "Chinese", "Korean", "Italian"]
+COUNTRIES = ["USA", "UK", "France", "Spain", "Germany", "Japan", "China", "South Korea", "Italy"]
+WORDS = [
+    "night", "city", "love", "war", "dark", "last", "secret", "lost", "river", "king",
+    "shadow", "dream", "road", "star", "fire", "winter", "house", "island", "storm", "ghost",
+    "blood", "silent", "golden", "broken", "wild", "empire", "heart", "edge", "mountain", "sea",
+]
+FIRST_NAMES = ["James", "Mary", "Wei", "Yuki", "Pierre", "Ana", "Hans", "Min-jun", "Luca", "Sofia"]
+LAST_NAMES = ["Smith", "Garcia", "Wang", "Sato", "Martin", "Rossi", "Muller", "Kim", "Brown", "Li"]
+
+
+def _person(rng: np.random.Generator) -> str:
+    return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+
+def _copy_rows(table: str, columns: list[str], rows: Iterable[Sequence[object]]) -> None:
+    with engine.raw_connection() as conn:
+        with conn.cursor() as cursor:
+            with cursor.copy(f'COPY "{table}" ({", ".join(columns)}) FROM STDIN') as copy:
+                for row in rows:
+                    copy.write_row(row)
+        conn.commit()
+
+
+def generate_users(n_users: int, password: str) -> None:
+    # bcrypt 很慢，所有用户共用同一个密码哈希
+    hashed_password = get_password_hash(password)
+    for start in range(0, n_users, COPY_BATCH_SIZE):
+        end = min(start + COPY_BATCH_SIZE, n_users)
+        _copy_rows(
+            "user",
+            ["email", "is_active", "is_superuser", "full_name", "hashed_password"],
+            (
+                (EMAIL_PATTERN.format(i), True, False, f"Bench User {i}", hashed_password)
+                for i in range(start, end)
+            ),
+        )
+        logger.info("Users: %d/%d", end, n_users)
+
+
+def generate_movies(n_movies: int, owner_id: int, rng: np.random.Generator) -> None:
+    def rows(start: int, end: int) -> Iterator[tuple[object, ...]]:
+        for i in range(start, end):
+            n_genres = int(rng.integers(1, 4))
+            yield (
+                " ".join(w.capitalize() for w in rng.choice(WORDS, int(rng.integers(1, 5)))),
+                str(int(rng.integers(1920, 2025))),
+                ", ".join(rng.choice(GENRES, n_genres, replace=False)),
+                _person(rng),
+                ", ".join(_person(rng) for _ in range(3)),
+                " ".join(rng.choice(WORDS, 30)).capitalize() + ".",
+                str(rng.choice(LANGUAGES)),
+                str(rng.choice(COUNTRIES)),
+                f"{rng.integers(10, 100) / 10:.1f}",
+                f"{IMDB_ID_PREFIX}{i:08d}",
+                owner_id,
+            )
+
+    columns = [
+        "title", "year", "genre", "director", "actors", "plot", "language", "country",
+        "imdb_rating", "imdb_id", "owner_id",
+    ]
+    for start in range(0, n_movies, COPY_BATCH_SIZE):
+        end = min(start + COPY_BATCH_SIZE, n_movies)
+        _copy_rows("movie", columns, rows(start, end))
+        # COPY 绕过了 crud，类型、语言、国家的筛选表要单独同步
+        with Session(engine) as session:
+            movie_ids = session.exec(
+                select(Movie.id).where(
+                    col(Movie.imdb_id) >= f"{IMDB_ID_PREFIX}{start:08d}",
+                    col(Movie.imdb_id) < f"{IMDB_ID_PREFIX}{end:08d}",
+                )
+            ).all()
+            sync_movie_facets(session, [movie_id for movie_id in movie_ids if movie_id is not None])
+            session.commit()
+        logger.info("Movies: %d/%d", end, n_movies)
+
+
+def generate_likes(
+    user_ids: list[int],
+    movie_ids: np.ndarray,
+    likes_per_user: float,
+    exponent: float,
+    rng: np.random.Generator,
+) -> int:
+    # 第 r 受欢迎的电影被选中的概率 ∝ 1 / r^exponent，排名随机打乱到电影 id 上
+    ranked = rng.permutation(movie_ids)
+    weights = 1.0 / np.arange(1, ranked.size + 1) ** exponent
+    cdf = np.cumsum(weights)
+    cdf /= cdf[-1]
+
+    total = 0
+    for start in range(0, len(user_ids), COPY_BATCH_SIZE):
+        batch = user_ids[start : start + COPY_BATCH_SIZE]
+        counts = np.minimum(rng.poisson(likes_per_user, len(batch)), ranked.size)
+        rows = []
+        for owner_id, count in zip(batch, counts):
+            picks = np.unique(np.searchsorted(cdf, rng.random(int(count))))
+            rows.append((owner_id, "{" + ",".join(str(int(m)) for m in ranked[picks]) + "}"))
+            total += picks.size
+        _copy_rows("usermovie", ["owner_id", "movies"], rows)
+        logger.info("Likes: %d/%d users", start + len(batch), len(user_ids))
+    return total
+
+
+def clean() -> None:
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            'DELETE FROM usermovie WHERE owner_id IN (SELECT id FROM "user" WHERE email LIKE %s)',
+            (EMAIL_PATTERN.format("%"),),
+        )
+        conn.exec_driver_sql(
+            'DELETE FROM "user" WHERE email LIKE %s', (EMAIL_PATTERN.format("%"),)
+        )
+        # 其他用户（例如超级用户）点赞过的生成电影：从 movies 数组里去掉，保持原来的顺序
+        conn.exec_driver_sql(
+            "UPDATE usermovie AS u SET movies = ARRAY("
+            "  SELECT t.m FROM unnest(u.movies) WITH ORDINALITY AS t(m, i)"
+            "  WHERE NOT EXISTS (SELECT 1 FROM movie WHERE id = t.m AND imdb_id LIKE %s)"
+            "  ORDER BY t.i"
+            ") WHERE EXISTS ("
+            "  SELECT 1 FROM unnest(u.movies) AS t(m) JOIN movie ON movie.id = t.m"
+            "  WHERE movie.imdb_id LIKE %s"
+            ")",
+            (IMDB_ID_PREFIX + "%", IMDB_ID_PREFIX + "%"),
+        )
+        conn.exec_driver_sql(
+            "DELETE FROM movie WHERE imdb_id LIKE %s", (IMDB_ID_PREFIX + "%",)
+        )
+    logger.info("Benchmark data removed")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Populate the database with synthetic benchmark data")
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--movies", type=int, default=200_000)
+    parser.add_argument("--likes-per-user", type=float, default=20.0)
+    parser.add_argument("--zipf-exponent", type=float, default=1.1)
+    parser.add_argument("--password", default="benchmark")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--clean", action="store_true", help="remove previously generated data and exit")
+    args = parser.parse_args()
+
+    if args.clean:
+        clean()
+        return
+
+    rng = np.random.default_rng(args.seed)
+    start = time.perf_counter()
+    with Session(engine) as session:
+        superuser = session.exec(
+            select(User).where(User.email == settings.FIRST_SUPERUSER)
+        ).first()
+        if superuser is None:
+            raise SystemExit("Superuser not found, run app.initial_data first")
+        existing = session.exec(
+            select(User.id).where(User.email.like(EMAIL_PATTERN.format("%")))  # type: ignore[attr-defined]
+        ).first()
+        if existing is not None:
+            raise SystemExit("Benchmark data already exists, run with --clean first")
+
+        generate_users(args.users, args.password)
+        generate_movies(args.movies, superuser.id, rng)
+
+        user_ids = list(
+            session.exec(
+                select(User.id)
+                .where(User.email.like(EMAIL_PATTERN.format("%")))  # type: ignore[attr-defined]
+                .order_by(User.id)
+            ).all()
+        )
+        # 超级用户已有点赞时保留原数据，否则也给它生成一份
+        superuser_likes = session.get(UserMovie, superuser.id)
+        if superuser_likes is None or not superuser_likes.movies:
+            session.exec(delete(UserMovie).where(UserMovie.owner_id == superuser.id))  # type: ignore
+            session.commit()
+            user_ids.insert(0, superuser.id)
+        movie_ids = np.asarray(
+            session.exec(
+                select(Movie.id).where(Movie.imdb_id.like(IMDB_ID_PREFIX + "%"))  # type: ignore[attr-defined]
+            ).all(),
+            dtype=np.int64,
+        )
+        likes = generate_likes(
+            user_ids, movie_ids, args.likes_per_user, args.zipf_exponent, rng
+        )
+        refresh_like_counts(session)
+
+    logger.info(
+        "Generated %d users, %d movies, %d likes in %.2fs",
+        args.users, args.movies, likes, time.perf_counter() - start,
+    )
+
+
+if __name__ == "__main__":
+    main()
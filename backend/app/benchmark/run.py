@@ -0,0 +1,197 @@
+"""
+对运行中的 API 做压测，报告每个接口的 p50/p95/p99 延迟和吞吐量，结果可以输出为 JSON 以便逐次对比。
+
+    python -m app.benchmark.run --base-url http://localhost:8000 --concurrency 16 --duration 30 --output run.json
+    python -m app.benchmark.run --compare baseline.json --output run.json
+
+默认以超级用户登录（/movies/ 能看到全部电影，/movies/{id} 不受权限限制），
+数据可以先用 app.benchmark.generate_data 生成。注意 PUT /user_movie/add/{id} 会修改该用户的点赞列表。
+"""
+import argparse
+import json
+import logging
+import platform
+import random
+import subprocess
+import threading
+import time
+from collections.abc import Callable
+from datetime import datetime, timezone
+
+import httpx
+import numpy as np
+
+from app.core.config import settings
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# 接口名 -> 根据随机数生成器和电影 id 列表构造 (方法, 路径)
+Scenario = Callable[[random.Random, list[int]], tuple[str, str]]
+
+SCENARIOS: dict[str, Scenario] = {
+    "list_movies": lambda rng, ids: ("GET", f"/movies/?skip={rng.randrange(0, 1000)}&limit=100"),
+    "liked_movies": lambda rng, ids: ("GET", "/movies/liked"),
+    "read_movie": lambda rng, ids: ("GET", f"/movies/{rng.choice(ids)}"),
+    "add_user_movie": lambda rng, ids: ("PUT", f"/user_movie/add/{rng.choice(ids)}"),
+}
+
+
+def login(client: httpx.Client, email: str, password: str) -> None:
+    response = client.post(
+        "/login/access-token", data={"username": email, "password": password}
+    )
+    response.raise_for_status()
+    client.headers["Authorization"] = f"Bearer {response.json()['access_token']}"
+
+
+def sample_movie_ids(client: httpx.Client, n: int) -> list[int]:
+    response = client.get("/movies/", params={"limit": n})
+    response.raise_for_status()
+    ids = [movie["id"] for movie in response.json()["data"]]
+    if not ids:
+        raise SystemExit("No movies found, run app.benchmark.generate_data first")
+    return ids
+
+
+def run_scenario(
+    name: str,
+    base_url: str,
+    headers: dict[str, str],
+    movie_ids: list[int],
+    concurrency: int,
+    duration: float,
+    warmup: float,
+) -> dict[str, float | int]:
+    scenario = SCENARIOS[name]
+    latencies: list[list[float]] = [[] for _ in range(concurrency)]
+    errors = [0] * concurrency
+    measure_from = time.perf_counter() + warmup
+    deadline = measure_from + duration
+
+    def worker(index: int) -> None:
+        rng = random.Random(index)
+        with httpx.Client(base_url=base_url, headers=headers, timeout=30) as client:
+            while True:
+                method, path = scenario(rng, movie_ids)
+                start = time.perf_counter()
+                if start >= deadline:
+                    return
+                try:
+                    failed = client.request(method, path).status_code >= 400
+                except httpx.HTTPError:
+                    failed = True
+                end = time.perf_counter()
+                # 预热阶段的请求不计入结果
+                if start >= measure_from:
+                    latencies[index].append(end - start)
+                    errors[index] += failed
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    samples = np.asarray([x for per_worker in latencies for x in per_worker]) * 1000
+    if samples.size == 0:
+        return {"requests": 0, "errors": sum(errors), "throughput_rps": 0.0}
+    p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+    return {
+        "requests": int(samples.size),
+        "errors": int(sum(errors)),
+        "throughput_rps": round(samples.size / duration, 2),
+        "mean_ms": round(float(samples.mean()), 3),
+        "p50_ms": round(float(p50), 3),
+        "p95_ms": round(float(p95), 3),
+        "p99_ms": round(float(p99), 3),
+        "max_ms": round(float(samples.max()), 3),
+    }
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> bool:
+    """
+    Log p95 and throughput changes against a previous run; True if any endpoint regressed
+    """
+    regressed = False
+    for name, current in results["endpoints"].items():
+        before = baseline.get("endpoints", {}).get(name)
+        if not before or not before.get("p95_ms") or "p95_ms" not in current:
+            continue
+        change = current["p95_ms"] / before["p95_ms"] - 1
+        logger.info(
+            "%-16s p95 %8.2fms -> %8.2fms (%+.1f%%), throughput %8.1f -> %8.1f rps",
+            name, before["p95_ms"], current["p95_ms"], change * 100,
+            before["throughput_rps"], current["throughput_rps"],
+        )
+        if change > threshold:
+            logger.warning("%s p95 regressed by more than %.0f%%", name, threshold * 100)
+            regressed = True
+    return regressed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the movie and user_movie APIs")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--email", default=settings.FIRST_SUPERUSER)
+    parser.add_argument("--password", default=settings.FIRST_SUPERUSER_PASSWORD)
+    parser.add_argument("--endpoints", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds measured per endpoint")
+    parser.add_argument("--warmup", type=float, default=2.0, help="seconds before measuring")
+    parser.add_argument("--movie-sample", type=int, default=1000, help="movie ids to pick requests from")
+    parser.add_argument("--output", help="write results as JSON")
+    parser.add_argument("--compare", help="previous JSON results to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="p95 increase counted as a regression")
+    args = parser.parse_args()
+
+    base_url = args.base_url.rstrip("/") + settings.API_V1_STR
+    with httpx.Client(base_url=base_url, timeout=30) as client:
+        login(client, args.email, args.password)
+        headers = dict(client.headers)
+        movie_ids = sample_movie_ids(client, args.movie_sample)
+
+    endpoints = {}
+    for name in args.endpoints:
+        endpoints[name] = run_scenario(
+            name, base_url, headers, movie_ids, args.concurrency, args.duration, args.warmup
+        )
+        result = endpoints[name]
+        logger.info(
+            "%-16s %7d requests %5d errors %9.1f rps  p50 %8.2fms  p95 %8.2fms  p99 %8.2fms",
+            name, result["requests"], result["errors"], result["throughput_rps"],
+            result.get("p50_ms", 0.0), result.get("p95_ms", 0.0), result.get("p99_ms", 0.0),
+        )
+
+    results = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "base_url": args.base_url,
+        "concurrency": args.concurrency,
+        "duration_seconds": args.duration,
+        "endpoints": endpoints,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        logger.info("Results written to %s", args.output)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.threshold):
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,13 @@
 
 #这些导入语句引入了所需的模块和库，包括 SQLModel 的会话、创建引擎、选择语句，以及应用程序的配置、CRUD 操作和用户模型。
-from sqlmodel import Session, create_engine, select
+from sqlmodel import Session, select
 
 from app.core.config import settings
+from app.core.engine import engine as engine
 from app.crud import users
 from app.models.user import User, UserCreate
 
-#这行代码创建了一个数据库引擎。settings.SQLALCHEMY_DATABASE_URI 包含了数据库连接 URI，该 URI 是根据先前定义的配置生成的。
-engine = create_engine(str(settings.SQLALCHEMY_DATABASE_URI))
+#数据库引擎在 app/core/engine.py 中按 Settings 的连接池参数创建，整个应用共用一个，这里重新导出以兼容已有的导入。
 
 
 #在初始化数据库之前，确保所有 SQLModel 模型已经被导入。这是为了确保模型之间的关系能够正确初始化。
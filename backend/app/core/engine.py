@@ -0,0 +1,98 @@
+"""
+整个应用共用的数据库引擎：连接池参数都来自 Settings（DB_*），API、脚本和离线任务都使用这里的 engine。
+
+每个进程有自己的连接池，一个进程最多持有 DB_POOL_SIZE + DB_MAX_OVERFLOW 个连接；
+gunicorn 的 worker 或 multiprocessing 的子进程 fork 出来以后会丢弃从父进程继承的连接，
+在子进程里重新建立连接。
+"""
+import os
+import weakref
+
+from sqlalchemy import Engine, event
+from sqlalchemy.pool import QueuePool
+from sqlmodel import create_engine
+
+from app.core.config import settings
+
+# 所有由 create_db_engine 创建的引擎（fork 之后逐个重置）-> 连接池事件的累计计数
+_pool_counters: "weakref.WeakKeyDictionary[Engine, dict[str, int]]" = weakref.WeakKeyDictionary()
+
+
+def create_db_engine(**overrides: object) -> Engine:
+    """
+    Create an engine with the pool settings from Settings; keyword arguments override them
+    """
+    connect_args: dict[str, object] = {}
+    if settings.DB_STATEMENT_TIMEOUT_MS > 0:
+        connect_args["options"] = f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"
+    options: dict[str, object] = {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "connect_args": connect_args,
+        **overrides,
+    }
+    db_engine = create_engine(str(settings.SQLALCHEMY_DATABASE_URI), **options)
+    _track_pool_events(db_engine)
+    return db_engine
+
+
+def _track_pool_events(db_engine: Engine) -> None:
+    # 连接池本身只知道当前状态，累计值用事件统计
+    counters = {"connects": 0, "checkouts": 0, "invalidations": 0}
+    _pool_counters[db_engine] = counters
+
+    @event.listens_for(db_engine, "connect")
+    def _on_connect(*_args: object) -> None:
+        counters["connects"] += 1
+
+    @event.listens_for(db_engine, "checkout")
+    def _on_checkout(*_args: object) -> None:
+        counters["checkouts"] += 1
+
+    @event.listens_for(db_engine, "invalidate")
+    def _on_invalidate(*_args: object) -> None:
+        counters["invalidations"] += 1
+
+
+def _dispose_after_fork() -> None:
+    # close=False：不能关闭父进程还在使用的连接，只是让子进程不再使用它们
+    for db_engine, counters in list(_pool_counters.items()):
+        db_engine.dispose(close=False)
+        counters.update(dict.fromkeys(counters, 0))
+
+
+os.register_at_fork(after_in_child=_dispose_after_fork)
+
+
+def pool_stats(db_engine: Engine) -> dict[str, int | float]:
+    """
+    Current utilisation of the engine's pool in this process plus cumulative event counters
+    """
+    pool = db_engine.pool
+    stats: dict[str, int | float] = {
+        "pid": os.getpid(),
+        "pool_size": 0,
+        "max_overflow": 0,
+        "checked_out": 0,
+        "checked_in": 0,
+        "overflow": 0,
+        "timeout": 0.0,
+    }
+    if isinstance(pool, QueuePool):
+        stats.update(
+            pool_size=pool.size(),
+            max_overflow=pool._max_overflow,
+            checked_out=pool.checkedout(),
+            checked_in=pool.checkedin(),
+            # 超出 pool_size 临时建立的连接数；QueuePool 在没有建满时为负数
+            overflow=max(pool.overflow(), 0),
+            timeout=pool.timeout(),
+        )
+    stats.update(_pool_counters.get(db_engine, {}))
+    return stats
+
+
+engine = create_db_engine()
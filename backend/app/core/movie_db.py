@@ -1,17 +1,12 @@
-from sqlmodel import create_engine, Session
 from app.models.omdb_movie import MovieCreateIn
-from app.crud.movies import create_movie  # 导入你定义的 create_movie 方法
 from typing import Dict, Any
 
-from app.core.config import settings
+# 与 API 共用同一个数据库引擎和连接池
+from app.core.engine import engine as engine
 
-# 创建数据库引擎
-#这行代码创建了一个数据库引擎。settings.SQLALCHEMY_DATABASE_URI 包含了数据库连接 URI，该 URI 是根据先前定义的配置生成的。
-engine = create_engine(str(settings.SQLALCHEMY_DATABASE_URI))
-
-#创建数据库model格式的电影对象
-def init_movie(session: Session, movie_data: Dict[str, Any], owner_id) -> None:
-    movie_in = MovieCreateIn(
+#把 OMDb 返回的数据转换为创建电影所需的模型
+def movie_create_in(movie_data: Dict[str, Any]) -> MovieCreateIn:
+    return MovieCreateIn(
         title=movie_data['Title'],
         year=movie_data['Year'],
         rated=movie_data['Rated'],
@@ -34,7 +29,3 @@ def init_movie(session: Session, movie_data: Dict[str, Any], owner_id) -> None:
         production=movie_data.get('Production'),
         website=movie_data.get('Website')
     )
-    
-    movie = create_movie(session=session, movie_in=movie_in, owner_id=owner_id)
-    print(f"Inserted movie: {movie.title}")
-
@@ -0,0 +1,161 @@
+"""
+OMDb API 客户端：所有请求共用一个 keep-alive 的 httpx.Client（线程安全），
+对超时、连接错误、429 和 5xx 做指数退避重试，并用令牌桶限制整体请求速率。
+可选的本地响应缓存（app/core/omdb_cache.py）命中时不发请求，也不占用速率限制。
+"""
+import logging
+import threading
+import time
+from typing import Any
+
+import httpx
+from tenacity import (
+    RetryCallState,
+    retry,
+    retry_if_exception,
+    stop_after_attempt,
+    wait_random_exponential,
+)
+
+from app.core.config import settings
+from app.core.omdb_cache import OmdbResponseCache, imdb_id_key, title_key
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimiter:
+    """
+    Token bucket shared by all threads; rate <= 0 disables limiting
+    """
+
+    def __init__(self, rate: float, burst: int = 1) -> None:
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+def is_transient_error(exc: BaseException) -> bool:
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code == 429 or exc.response.status_code >= 500
+    return isinstance(exc, httpx.TransportError)
+
+
+def _describe(exc: BaseException | None) -> str:
+    # 异常信息里的 URL 带有 apikey，不能直接写进日志
+    if isinstance(exc, httpx.HTTPStatusError):
+        return f"HTTP {exc.response.status_code}"
+    return type(exc).__name__
+
+
+def _log_retry(retry_state: RetryCallState) -> None:
+    assert retry_state.outcome is not None and retry_state.next_action is not None
+    logger.warning(
+        "OMDb request failed (%s), attempt %d, retrying in %.2fs",
+        _describe(retry_state.outcome.exception()),
+        retry_state.attempt_number,
+        retry_state.next_action.sleep,
+    )
+
+
+class OmdbFetchError(Exception):
+    """
+    A request still failed after all retries; unlike "not found", worth trying again later
+    """
+
+
+class OmdbClient:
+    def __init__(
+        self,
+        base_url: str = settings.OMDB_API_URL,
+        api_key: str = settings.OMDB_API_KEY,
+        rate_limit: float = settings.OMDB_RATE_LIMIT,
+        max_connections: int = settings.OMDB_CONCURRENCY,
+        timeout: float = 10.0,
+        cache: OmdbResponseCache | None = None,
+    ) -> None:
+        self.api_key = api_key
+        self.cache = cache
+        self.rate_limiter = RateLimiter(rate_limit, burst=max_connections)
+        self._client = httpx.Client(
+            base_url=base_url,
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=max_connections, max_keepalive_connections=max_connections
+            ),
+        )
+
+    def close(self) -> None:
+        self._client.close()
+
+    def __enter__(self) -> "OmdbClient":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    @retry(
+        retry=retry_if_exception(is_transient_error),
+        wait=wait_random_exponential(multiplier=0.5, max=30),
+        stop=stop_after_attempt(settings.OMDB_MAX_ATTEMPTS),
+        before_sleep=_log_retry,
+        reraise=True,
+    )
+    def _get(self, params: dict[str, str]) -> dict[str, Any]:
+        self.rate_limiter.acquire()
+        response = self._client.get("/", params={"apikey": self.api_key, **params})
+        response.raise_for_status()
+        # OMDb 出错时偶尔返回 HTML 页面：解析失败抛出 ValueError（JSONDecodeError）
+        data = response.json()
+        if not isinstance(data, dict):
+            raise ValueError("OMDb response is not a JSON object")
+        return data
+
+    def _fetch(
+        self, key: str, params: dict[str, str], what: str, raise_errors: bool
+    ) -> dict[str, Any] | None:
+        data = self.cache.get(key) if self.cache is not None else None
+        if data is None:
+            try:
+                data = self._get(params)
+            except (httpx.HTTPError, ValueError) as e:
+                logger.error("Failed to fetch %s: %s", what, _describe(e))
+                if raise_errors:
+                    raise OmdbFetchError(what) from e
+                return None
+            # "未找到"也缓存，下次不用再问；请求失败不缓存
+            if self.cache is not None:
+                self.cache.put(key, data)
+        if data.get("Response") == "False":
+            logger.info("Movie not found: %s (%s)", what, data.get("Error"))
+            return None
+        return data
+
+    def fetch_by_title(self, title: str, raise_errors: bool = False) -> dict[str, Any] | None:
+        """
+        Fetch one movie by title; None if OMDb does not know it or the request keeps failing
+        (with raise_errors, OmdbFetchError for the latter)
+        """
+        return self._fetch(title_key(title), {"t": title}, repr(title), raise_errors)
+
+    def fetch_by_imdb_id(self, imdb_id: str, raise_errors: bool = False) -> dict[str, Any] | None:
+        """
+        Fetch one movie by imdbID; None if OMDb does not know it or the request keeps failing
+        (with raise_errors, OmdbFetchError for the latter)
+        """
+        return self._fetch(imdb_id_key(imdb_id), {"i": imdb_id}, imdb_id, raise_errors)
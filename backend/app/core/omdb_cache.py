@@ -0,0 +1,120 @@
+"""
+OMDb 响应的本地持久化缓存（SQLite），在发 HTTP 请求之前查询。
+
+按规范化后的标题（t:...）或 imdbID（i:...）作为 key，"未找到"的响应也会缓存；
+超过 TTL 的条目视为未命中，条目数超过上限时按最近访问时间淘汰最旧的一部分。
+重新初始化开发/测试数据库时，所有请求都可以直接从缓存返回。
+"""
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+from app.core.config import settings
+
+
+def title_key(title: str) -> str:
+    return "t:" + " ".join(title.casefold().split())
+
+
+def imdb_id_key(imdb_id: str) -> str:
+    return "i:" + imdb_id.strip().lower()
+
+
+class OmdbResponseCache:
+    # 每写入这么多条检查一次是否超过上限，淘汰时删到上限的 90%
+    EVICT_CHECK_INTERVAL = 1000
+    EVICT_TO = 0.9
+
+    def __init__(
+        self,
+        path: str | Path = settings.OMDB_CACHE_PATH,
+        ttl: float = settings.OMDB_CACHE_TTL_SECONDS,
+        max_entries: int = settings.OMDB_CACHE_MAX_ENTRIES,
+    ) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        # 导入时多个线程共用一个连接，由锁保证串行访问
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS response ("
+            " key TEXT PRIMARY KEY, body TEXT NOT NULL,"
+            " fetched_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_response_accessed_at ON response (accessed_at)"
+        )
+        self._lock = threading.Lock()
+        self._writes_since_check = 0
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.stores = 0
+        self.evictions = 0
+
+    def close(self) -> None:
+        with self._lock:
+            self._evict()
+            self._conn.close()
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, fetched_at FROM response WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            body, fetched_at = row
+            if now - fetched_at > self.ttl:
+                self.expired += 1
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE response SET accessed_at = ? WHERE key = ?", (now, key))
+            self.hits += 1
+        return json.loads(body)
+
+    def put(self, key: str, data: dict[str, Any]) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO response (key, body, fetched_at, accessed_at)"
+                " VALUES (?, ?, ?, ?)",
+                (key, json.dumps(data), now, now),
+            )
+            self.stores += 1
+            self._writes_since_check += 1
+            if self._writes_since_check >= self.EVICT_CHECK_INTERVAL:
+                self._writes_since_check = 0
+                self._evict()
+
+    def _evict(self) -> None:
+        (count,) = self._conn.execute("SELECT count(*) FROM response").fetchone()
+        if count <= self.max_entries:
+            return
+        excess = count - int(self.max_entries * self.EVICT_TO)
+        self._conn.execute(
+            "DELETE FROM response WHERE key IN"
+            " (SELECT key FROM response ORDER BY accessed_at LIMIT ?)",
+            (excess,),
+        )
+        self.evictions += excess
+
+    def stats(self) -> dict[str, int | float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "expired": self.expired,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "stores": self.stores,
+                "evictions": self.evictions,
+            }
@@ -0,0 +1,79 @@
+"""
+电影海报的本地存储：按原图内容的 sha256 寻址，每张海报只保存几种固定宽度的 JPEG 缩略图。
+
+    data/posters/3f/3f9a...c1_small.jpg
+
+同一张图片（包括不同电影共用的海报）只会保存一次；文件一旦写入就不会再改变，
+所以接口可以用 key 作为强 ETag，并让浏览器长期缓存。
+"""
+import hashlib
+import io
+import os
+import re
+import tempfile
+from pathlib import Path
+
+from PIL import Image
+
+from app.core.config import settings
+
+# 缩略图名称 -> 宽度（像素），高度按原图比例缩放，原图更小时不放大
+POSTER_SIZES = {"small": 185, "medium": 342, "large": 500}
+POSTER_MEDIA_TYPE = "image/jpeg"
+KEY_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
+
+def poster_key(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class PosterStore:
+    JPEG_QUALITY = 85
+
+    def __init__(self, root: str | Path = settings.POSTER_STORE_DIR) -> None:
+        self.root = Path(root)
+
+    def path_for(self, key: str, size: str) -> Path:
+        # 按前两位分目录，避免单个目录里文件过多
+        return self.root / key[:2] / f"{key}_{size}.jpg"
+
+    def exists(self, key: str) -> bool:
+        return all(self.path_for(key, size).is_file() for size in POSTER_SIZES)
+
+    def save(self, data: bytes) -> str:
+        """
+        Store thumbnails of an original poster image and return its key; raises
+        PIL.UnidentifiedImageError if it is not an image, Image.DecompressionBombError if it is too large
+        """
+        key = poster_key(data)
+        if self.exists(key):
+            return key
+        with Image.open(io.BytesIO(data)) as image:
+            image = image.convert("RGB")
+            thumbnails: dict[str, bytes] = {}
+            for size, width in POSTER_SIZES.items():
+                thumbnail = image.copy()
+                thumbnail.thumbnail((width, width * 3), Image.Resampling.LANCZOS)
+                buffer = io.BytesIO()
+                thumbnail.save(
+                    buffer, "JPEG", quality=self.JPEG_QUALITY, optimize=True, progressive=True
+                )
+                thumbnails[size] = buffer.getvalue()
+        for size, content in thumbnails.items():
+            self._write(self.path_for(key, size), content)
+        return key
+
+    def _write(self, path: Path, content: bytes) -> None:
+        # 先写临时文件再原子替换，并发写同一个 key 或中途退出都不会留下不完整的文件
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(content)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+
+poster_store = PosterStore()
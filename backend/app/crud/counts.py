@@ -0,0 +1,106 @@
+"""
+列表接口返回的总数（count）的计算策略，由每个请求的 count_mode 参数选择：
+
+- exact：每次执行 count(*)
+- cached：count(*) 的结果按查询（SQL 和参数）缓存在进程内（LRU + TTL），表有新增/删除/修改时失效
+- estimate：不带筛选条件的整表计数读取 pg_class.reltuples（ANALYZE/autovacuum 维护的估计值），
+  带条件时同 cached
+- none：不计算，返回 None
+
+失效只作用于当前进程，其他 worker 最多在 COUNT_CACHE_TTL_SECONDS 之后看到变化；
+导入脚本在另一个进程里写入时同样依赖 TTL。
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Literal
+
+from sqlalchemy import ColumnElement, Select, text
+from sqlmodel import Session, SQLModel, func, select
+
+from app.core.config import settings
+
+CountMode = Literal["exact", "cached", "estimate", "none"]
+
+
+class CountCache:
+    def __init__(self, max_size: int, ttl: float) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+        # (表名, 表的版本, 查询) -> (过期时间, 结果)，按最近使用排序；结果通常是总数，也可以是分组计数
+        self._entries: OrderedDict[tuple[str, int, str], tuple[float, Any]] = OrderedDict()
+        # 表名 -> 版本；失效时版本加一，旧版本的条目不会再命中，之后被 LRU 淘汰
+        self._generations: dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, table: str, query: str) -> Any | None:
+        with self._lock:
+            key = (table, self._generations.get(table, 0), query)
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, table: str, query: str, value: Any) -> None:
+        with self._lock:
+            key = (table, self._generations.get(table, 0), query)
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, table: str) -> None:
+        with self._lock:
+            self._generations[table] = self._generations.get(table, 0) + 1
+
+
+count_cache = CountCache(settings.COUNT_CACHE_SIZE, settings.COUNT_CACHE_TTL_SECONDS)
+
+
+def invalidate_counts(model: type[SQLModel]) -> None:
+    """
+    Forget cached counts of a table after rows were added, removed or changed
+    """
+    count_cache.invalidate(model.__tablename__)  # type: ignore[arg-type]
+
+
+def cache_key(statement: Select[Any]) -> str:
+    compiled = statement.compile()
+    return f"{compiled} {sorted(compiled.params.items())!r}"
+
+
+def count_rows(
+    session: Session,
+    model: type[SQLModel],
+    conditions: list[ColumnElement[bool]],
+    mode: CountMode = "cached",
+) -> int | None:
+    """
+    Count the rows of model matching conditions using the given strategy
+    """
+    if mode == "none":
+        return None
+    table: str = model.__tablename__  # type: ignore[assignment]
+    if mode == "estimate" and not conditions:
+        estimate = session.exec(  # type: ignore
+            text("SELECT reltuples FROM pg_class WHERE oid = to_regclass(quote_ident(:table))"),
+            params={"table": table},
+        ).scalar()
+        # 从未 ANALYZE 过的表没有估计值（0 或 -1），退回精确计数
+        if estimate is not None and estimate > 0:
+            return int(estimate)
+
+    statement = select(func.count()).select_from(model).where(*conditions)
+    if mode == "exact":
+        return session.exec(statement).one()
+    query = cache_key(statement)
+    count = count_cache.get(table, query)
+    if count is None:
+        count = session.exec(statement).one()
+        count_cache.put(table, query, count)
+    return count
@@ -0,0 +1,102 @@
+from collections.abc import Sequence
+
+from sqlalchemy import ColumnElement, text, tuple_
+from sqlmodel import Session, col, exists, func, select
+
+from app.crud.counts import cache_key, count_cache
+from app.models.facet import Facet, FacetCountOut, MovieFacet
+from app.models.omdb_movie import Movie
+
+# 把指定电影的 genre/language/country 拆成 (movie_id, kind, name)，拆分规则与 moviepopularity.genres 相同
+_FACET_VALUES_SQL = r"""
+    SELECT m.id AS movie_id, f.kind, v.name
+    FROM movie AS m
+    CROSS JOIN LATERAL (
+        VALUES ('genre', m.genre), ('language', m.language), ('country', m.country)
+    ) AS f(kind, value)
+    CROSS JOIN LATERAL regexp_split_to_table(btrim(f.value), '\s*,\s*') AS v(name)
+    WHERE m.id = ANY(:movie_ids) AND v.name NOT IN ('', 'N/A')
+"""
+
+
+def sync_movie_facets(session: Session, movie_ids: Sequence[int]) -> None:
+    """
+    Rebuild the facet links of the given movies from their strings; the caller commits
+    """
+    if not movie_ids:
+        return
+    params = {"movie_ids": list(movie_ids)}
+    # 按固定顺序插入新的取值，并行导入的批次之间不会互相死锁
+    session.exec(  # type: ignore
+        text(
+            f"INSERT INTO facet (kind, name) "
+            f"SELECT DISTINCT kind, name FROM ({_FACET_VALUES_SQL}) AS v ORDER BY kind, name "
+            f"ON CONFLICT (kind, name) DO NOTHING"
+        ),
+        params=params,
+    )
+    session.exec(  # type: ignore
+        text("DELETE FROM moviefacet WHERE movie_id = ANY(:movie_ids)"), params=params
+    )
+    session.exec(  # type: ignore
+        text(
+            f"INSERT INTO moviefacet (facet_id, movie_id) "
+            f"SELECT DISTINCT f.id, v.movie_id FROM ({_FACET_VALUES_SQL}) AS v "
+            f"JOIN facet AS f ON f.kind = v.kind AND f.name = v.name"
+        ),
+        params=params,
+    )
+
+
+def read_facet_ids(session: Session, wanted: Sequence[tuple[str, str]]) -> list[int] | None:
+    """
+    Ids of the (kind, name) facets; None if any of them does not exist
+    """
+    keys = set(wanted)
+    if not keys:
+        return []
+    # 一次查询取出所有取值，(kind, name) 有唯一约束
+    rows = session.exec(
+        select(Facet.kind, Facet.name, Facet.id).where(
+            tuple_(col(Facet.kind), col(Facet.name)).in_(keys)
+        )
+    ).all()
+    found = {(kind, name): facet_id for kind, name, facet_id in rows if facet_id is not None}
+    if len(found) < len(keys):
+        return None
+    return [found[key] for key in keys]
+
+
+def has_facet(facet_id: int) -> ColumnElement[bool]:
+    # 在 moviefacet 主键 (facet_id, movie_id) 上查找，多个分面的条件互相独立
+    return exists().where(
+        col(MovieFacet.facet_id) == facet_id, col(MovieFacet.movie_id) == Movie.id
+    )
+
+
+def read_facet_counts(
+    session: Session, conditions: list[ColumnElement[bool]], limit: int
+) -> dict[str, list[FacetCountOut]]:
+    """
+    Number of matching movies per facet value, the most common `limit` values of each kind
+    """
+    statement = (
+        select(Facet.kind, Facet.name, func.count())
+        .select_from(MovieFacet)
+        .join(Facet, col(Facet.id) == MovieFacet.facet_id)
+        .group_by(col(Facet.id))
+    )
+    if conditions:
+        statement = statement.where(
+            col(MovieFacet.movie_id).in_(select(Movie.id).where(*conditions))
+        )
+    # 分组计数与总数一起缓存，电影有变化时失效
+    query = cache_key(statement)
+    facets = count_cache.get(Movie.__tablename__, query)
+    if facets is None:
+        rows = sorted(session.exec(statement).all(), key=lambda row: (-row[2], row[1]))
+        facets = {}
+        for kind, name, count in rows:
+            facets.setdefault(kind, []).append(FacetCountOut(name=name, count=count))
+        count_cache.put(Movie.__tablename__, query, facets)
+    return {kind: values[:limit] for kind, values in facets.items()}
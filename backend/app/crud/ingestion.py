@@ -0,0 +1,62 @@
+import hashlib
+from collections.abc import Sequence
+from datetime import datetime
+
+from sqlmodel import Session, col, select
+
+from app.models.ingestion import IngestionBatch, IngestionRun
+
+
+def source_hash(items: Sequence[str]) -> str:
+    digest = hashlib.sha256()
+    for item in items:
+        digest.update(item.encode("utf-8"))
+        digest.update(b"\n")
+    return digest.hexdigest()
+
+
+def start_or_resume_run(
+    session: Session, *, source: str, items: Sequence[str], batch_size: int, resume: bool = True
+) -> IngestionRun:
+    """
+    Resume the latest unfinished run over the same items and batch size, or start a new one
+    """
+    items_hash = source_hash(items)
+    if resume:
+        run = session.exec(
+            select(IngestionRun)
+            .where(IngestionRun.source_hash == items_hash)
+            .where(IngestionRun.batch_size == batch_size)
+            .where(col(IngestionRun.finished_at).is_(None))
+            .order_by(col(IngestionRun.id).desc())
+        ).first()
+        if run is not None:
+            return run
+    run = IngestionRun(
+        source=source,
+        source_hash=items_hash,
+        item_count=len(items),
+        batch_size=batch_size,
+        batch_count=-(-len(items) // batch_size),
+    )
+    session.add(run)
+    session.commit()
+    session.refresh(run)
+    return run
+
+
+def read_completed_batches(session: Session, run_id: int) -> list[IngestionBatch]:
+    return list(
+        session.exec(select(IngestionBatch).where(IngestionBatch.run_id == run_id)).all()
+    )
+
+
+def record_batch(session: Session, batch: IngestionBatch) -> None:
+    session.add(batch)
+    session.commit()
+
+
+def finish_run(session: Session, run: IngestionRun) -> None:
+    run.finished_at = datetime.utcnow()
+    session.add(run)
+    session.commit()
@@ -1,7 +1,13 @@
 
-from sqlmodel import create_engine, Session, select, func
-from app.models.omdb_movie import Movie, MovieCreateIn, MoviesPublicOut
+from collections.abc import Sequence
+from operator import attrgetter
+
+from sqlalchemy import text
+from sqlmodel import Session, select, func
+from app.models.omdb_movie import Movie, MovieCreateIn, MoviesPublicOut, MovieUpsertResult
 from app.models.user_movie import UserMovie
+from app.crud.counts import invalidate_counts
+from app.crud.facets import sync_movie_facets
 from app.api.deps import SessionDep, CurrentUser
 
 #创建movie实例并添加到数据库中
@@ -13,13 +19,100 @@ def create_movie(*, session: Session, movie_in: MovieCreateIn, owner_id: int) ->
     )
     # 添加到会话中
     session.add(db_movie)
+    session.flush()
+    sync_movie_facets(session, [db_movie.id])
     session.commit()
+    invalidate_counts(Movie)
     # 刷新会话以获取最新的数据
     session.refresh(db_movie)
     
     return db_movie
 
 
+#按 imdb_id 批量 upsert：整批先 COPY 到临时表，再分别
+#  1. 更新内容有变化的已有电影（没变化的行不会被写，不产生新的行版本和 WAL）
+#  2. 插入不存在的电影（先用 NOT EXISTS 过滤，避免 ON CONFLICT 为每行白白消耗一个序列值）
+#重复导入没有变化的数据时，只有 COPY 到临时表和按唯一索引的查找。
+def upsert_movies(
+    *,
+    session: Session,
+    movies_in: Sequence[MovieCreateIn],
+    owner_id: int,
+    update_existing: bool = True,
+) -> MovieUpsertResult:
+    result = MovieUpsertResult()
+    # 同一批里重复的 imdb_id 只保留最后一条
+    latest = {movie_in.imdb_id: movie_in for movie_in in movies_in}
+    result.skipped = len(movies_in) - len(latest)
+    if not latest:
+        return result
+
+    columns = list(MovieCreateIn.model_fields)
+    column_list = ", ".join(columns)
+    session.exec(  # type: ignore
+        text(
+            f"CREATE TEMP TABLE IF NOT EXISTS movie_staging ON COMMIT DELETE ROWS AS "
+            f"SELECT {column_list} FROM movie WITH NO DATA"
+        )
+    )
+    values_of = attrgetter(*columns)
+    raw_connection = session.connection().connection.driver_connection
+    with raw_connection.cursor() as cursor:
+        with cursor.copy(f"COPY movie_staging ({column_list}) FROM STDIN") as copy:
+            for movie_in in latest.values():
+                copy.write_row(values_of(movie_in))
+
+    differs = (
+        f"({', '.join('m.' + c for c in columns)}) "
+        f"IS DISTINCT FROM ({', '.join('s.' + c for c in columns)})"
+    )
+    changed_ids: list[int] = []
+    if update_existing:
+        # 并行导入的批次可能包含相同的电影：先按 imdb_id 的顺序锁住要更新的行，
+        # 各批按同样的顺序加锁，不会互相死锁；没有变化的行不加锁（加锁也会写入元组）
+        session.exec(  # type: ignore
+            text(
+                f"SELECT 1 FROM movie AS m JOIN movie_staging AS s ON m.imdb_id = s.imdb_id "
+                f"WHERE {differs} ORDER BY m.imdb_id FOR UPDATE OF m"
+            )
+        )
+        changed = ", ".join(f"{c} = s.{c}" for c in columns if c != "imdb_id")
+        # 海报地址变了，本地缩略图需要重新下载
+        changed += (
+            ", poster_key = CASE WHEN m.poster IS DISTINCT FROM s.poster "
+            "THEN NULL ELSE m.poster_key END, version = m.version + 1"
+        )
+        updated = session.exec(  # type: ignore
+            text(
+                f"UPDATE movie AS m SET {changed} FROM movie_staging AS s "
+                f"WHERE m.imdb_id = s.imdb_id AND {differs} "
+                f"RETURNING m.id"
+            )
+        )
+        changed_ids.extend(updated.scalars())
+        result.updated = len(changed_ids)
+    inserted = session.exec(  # type: ignore
+        text(
+            f"INSERT INTO movie ({column_list}, owner_id) "
+            f"SELECT {column_list}, :owner_id FROM movie_staging AS s "
+            f"WHERE NOT EXISTS (SELECT 1 FROM movie AS m WHERE m.imdb_id = s.imdb_id) "
+            # 同样按 imdb_id 的顺序插入，两批同时插入相同的电影时按同样的顺序等待对方
+            f"ORDER BY s.imdb_id "
+            f"ON CONFLICT (imdb_id) DO NOTHING RETURNING id"
+        ),
+        params={"owner_id": owner_id},
+    )
+    inserted_ids = list(inserted.scalars())
+    result.inserted = len(inserted_ids)
+    # 只重建新增和有变化的电影的分面，重复导入没有变化的数据时不产生写入
+    sync_movie_facets(session, changed_ids + inserted_ids)
+    session.commit()
+    invalidate_counts(Movie)
+
+    result.skipped += len(latest) - result.inserted - result.updated
+    return result
+
+
 def read_movies_by_ids(session: SessionDep, current_user: CurrentUser) -> MoviesPublicOut:
     """
     Get Movies by IDs
@@ -45,4 +138,18 @@ def read_movies_by_ids(session: SessionDep, current_user: CurrentUser) -> Movies
     if not movies:
         raise ValueError(f"Movies Not found {ids}")
 
-    return MoviesPublicOut(data=movies, count=count)
\ No newline at end of file
+    return MoviesPublicOut(data=movies, count=count)
+
+
+def read_movies_in_order(session: Session, ids: list[int]) -> MoviesPublicOut:
+    """
+    Get Movies by IDs, keeping the order of ids (e.g. a ranked recommendation list)
+    """
+    if not ids:
+        return MoviesPublicOut(data=[], count=0)
+
+    statement = select(Movie).where(Movie.id.in_(ids))
+    movies_by_id = {movie.id: movie for movie in session.exec(statement).all()}
+    movies = [movies_by_id[i] for i in ids if i in movies_by_id]
+
+    return MoviesPublicOut(data=movies, count=len(movies))
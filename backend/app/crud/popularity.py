@@ -0,0 +1,156 @@
+import math
+from collections.abc import Sequence
+from datetime import datetime
+
+from sqlalchemy import case, func, literal, text, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import Session, col, select
+
+from app.core.config import settings
+from app.models.omdb_movie import Movie
+from app.models.popularity import MoviePopularity
+
+# 前向衰减的固定起点；热度存的是对数，不会因为起点太早而溢出
+TRENDING_EPOCH = datetime(2024, 1, 1)
+# ln(1 + exp(-x)) 在 x 超过这个值时小于 1e-13，直接忽略，也避免 exp 下溢报错
+_LOG_EPSILON = 30.0
+
+
+def trending_weight(at: datetime) -> float:
+    """
+    Log weight of a like at the given time: (at - epoch) / tau, tau from the half-life
+    """
+    tau = settings.TRENDING_HALF_LIFE_HOURS * 3600 / math.log(2)
+    return (at - TRENDING_EPOCH).total_seconds() / tau
+
+
+def record_popularity_like(session: Session, movie_id: int) -> None:
+    """
+    Count a new like in moviepopularity; committed together with the usermovie change
+    """
+    now = datetime.utcnow()
+    weight = trending_weight(now)
+    table = MoviePopularity.__table__
+    # 电影第一次被点赞时建行，类型从 movie.genre 拆分
+    statement = insert(table).from_select(
+        ["movie_id", "like_count", "trending_score", "genres", "updated_at"],
+        select(
+            Movie.id,
+            literal(1),
+            literal(weight),
+            func.coalesce(
+                func.regexp_split_to_array(func.nullif(Movie.genre, ""), r"\s*,\s*"),
+                literal([], type_=table.c.genres.type),
+            ),
+            literal(now),
+        ).where(Movie.id == movie_id),
+    )
+    current = table.c.trending_score
+    # log(exp(a) + exp(b)) = max(a, b) + log(1 + exp(-|a - b|))
+    diff = func.abs(current - weight)
+    statement = statement.on_conflict_do_update(
+        index_elements=["movie_id"],
+        set_={
+            "like_count": table.c.like_count + 1,
+            "trending_score": case(
+                (current.is_(None), weight),
+                (diff > _LOG_EPSILON, func.greatest(current, weight)),
+                else_=func.greatest(current, weight) + func.ln(1 + func.exp(-diff)),
+            ),
+            "updated_at": now,
+        },
+    )
+    session.exec(statement)  # type: ignore
+
+
+def record_popularity_unlike(session: Session, movie_id: int) -> None:
+    """
+    Retract a like from moviepopularity
+    """
+    now = datetime.utcnow()
+    weight = trending_weight(now)
+    table = MoviePopularity.__table__
+    current = table.c.trending_score
+    # 不知道原来的点赞时间，按当前时刻的权重扣除（不会少于当初加上的量），
+    # 这样反复点赞/取消点赞不能刷高热度
+    statement = (
+        update(table)
+        .where(table.c.movie_id == movie_id)
+        .values(
+            like_count=func.greatest(table.c.like_count - 1, 0),
+            trending_score=case(
+                (current - weight > _LOG_EPSILON, current),
+                (current > weight, current + func.ln(1 - func.exp(weight - current))),
+                else_=None,
+            ),
+            updated_at=now,
+        )
+    )
+    session.exec(statement)  # type: ignore
+
+
+def read_popular_movie_ids(
+    session: Session, k: int, genre: str | None = None, exclude: Sequence[int] = ()
+) -> list[int]:
+    """
+    Movie ids with the most likes, optionally within one genre
+    """
+    statement = select(MoviePopularity.movie_id).where(MoviePopularity.like_count > 0)
+    if genre:
+        statement = statement.where(col(MoviePopularity.genres).contains([genre]))
+    if exclude:
+        statement = statement.where(col(MoviePopularity.movie_id).not_in(exclude))
+    statement = statement.order_by(
+        col(MoviePopularity.like_count).desc(), col(MoviePopularity.movie_id).desc()
+    ).limit(k)
+    return list(session.exec(statement).all())
+
+
+def read_trending_movie_ids(session: Session, k: int, genre: str | None = None) -> list[int]:
+    """
+    Movie ids ranked by time-decayed like activity
+    """
+    statement = select(MoviePopularity.movie_id).where(
+        col(MoviePopularity.trending_score).is_not(None)
+    )
+    if genre:
+        statement = statement.where(col(MoviePopularity.genres).contains([genre]))
+    statement = statement.order_by(col(MoviePopularity.trending_score).desc()).limit(k)
+    return list(session.exec(statement).all())
+
+
+def refresh_like_counts(session: Session) -> int:
+    """
+    Recount likes and genres from usermovie, correcting any drift; trending scores are kept
+    """
+    now = datetime.utcnow()
+    result = session.exec(  # type: ignore
+        text(
+            """
+            WITH counts AS (
+                SELECT liked AS movie_id, count(DISTINCT owner_id) AS like_count
+                FROM usermovie, unnest(movies) AS liked
+                GROUP BY liked
+            )
+            INSERT INTO moviepopularity (movie_id, like_count, trending_score, genres, updated_at)
+            SELECT movie.id, counts.like_count, NULL,
+                   coalesce(regexp_split_to_array(nullif(movie.genre, ''), '\\s*,\\s*'), '{}'),
+                   :now
+            FROM counts JOIN movie ON movie.id = counts.movie_id
+            ON CONFLICT (movie_id) DO UPDATE
+            SET like_count = excluded.like_count,
+                genres = excluded.genres,
+                updated_at = excluded.updated_at
+            """
+        ),
+        params={"now": now},
+    )
+    refreshed = result.rowcount
+    # 已经没人点赞的电影清零
+    session.exec(  # type: ignore
+        update(MoviePopularity)
+        .where(col(MoviePopularity.updated_at) < now)
+        .values(like_count=0, updated_at=now)
+    )
+    session.commit()
+    return refreshed
@@ -0,0 +1,106 @@
+from datetime import datetime
+
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import Session, col, select
+
+from app.models.rating import RATING_MAX, RATING_MIN, MovieRatingStats, Rating
+
+
+def _empty_histogram() -> list[int]:
+    return [0] * (RATING_MAX - RATING_MIN + 1)
+
+
+def _lock_stats(session: Session, movie_id: int) -> MovieRatingStats:
+    # 先保证汇总行存在，再锁住它，同一部电影的评分修改串行执行，汇总不会丢失更新
+    session.exec(  # type: ignore
+        insert(MovieRatingStats)
+        .values(
+            movie_id=movie_id,
+            rating_count=0,
+            rating_sum=0,
+            histogram=_empty_histogram(),
+            average=None,
+        )
+        .on_conflict_do_nothing(index_elements=["movie_id"])
+    )
+    stats = session.get(MovieRatingStats, movie_id, with_for_update=True, populate_existing=True)
+    assert stats is not None
+    return stats
+
+
+def _apply(stats: MovieRatingStats, old: int | None, new: int | None) -> None:
+    histogram = list(stats.histogram) or _empty_histogram()
+    if old is not None:
+        stats.rating_count -= 1
+        stats.rating_sum -= old
+        histogram[old - RATING_MIN] -= 1
+    if new is not None:
+        stats.rating_count += 1
+        stats.rating_sum += new
+        histogram[new - RATING_MIN] += 1
+    stats.histogram = histogram
+    stats.average = stats.rating_sum / stats.rating_count if stats.rating_count else None
+
+
+def rate_movie(*, session: Session, owner_id: int, movie_id: int, score: int) -> Rating:
+    """
+    Create or change a user's rating and update the movie's aggregates in the same transaction
+    """
+    stats = _lock_stats(session, movie_id)
+    rating = session.get(Rating, (owner_id, movie_id))
+    if rating is None:
+        rating = Rating(owner_id=owner_id, movie_id=movie_id, score=score)
+        _apply(stats, None, score)
+    else:
+        _apply(stats, rating.score, score)
+        rating.score = score
+        rating.updated_at = datetime.utcnow()
+
+    session.add(rating)
+    session.add(stats)
+    session.commit()
+    session.refresh(rating)
+    return rating
+
+
+def unrate_movie(*, session: Session, owner_id: int, movie_id: int) -> bool:
+    """
+    Remove a user's rating; returns False if there was none
+    """
+    if session.get(Rating, (owner_id, movie_id)) is None:
+        return False
+    stats = _lock_stats(session, movie_id)
+    rating = session.get(Rating, (owner_id, movie_id), populate_existing=True)
+    if rating is None:
+        # 加锁之前被并发删除了
+        session.rollback()
+        return False
+
+    _apply(stats, rating.score, None)
+    session.delete(rating)
+    session.add(stats)
+    session.commit()
+    return True
+
+
+def read_rating_stats(session: Session, movie_id: int) -> MovieRatingStats:
+    stats = session.get(MovieRatingStats, movie_id)
+    if stats is None:
+        return MovieRatingStats(
+            movie_id=movie_id, rating_count=0, rating_sum=0, histogram=_empty_histogram()
+        )
+    return stats
+
+
+def read_top_rated_movie_ids(session: Session, k: int, min_count: int = 1) -> list[int]:
+    """
+    Movie ids with the highest average rating among movies with at least min_count ratings
+    """
+    statement = (
+        select(MovieRatingStats.movie_id)
+        .where(col(MovieRatingStats.average).is_not(None))
+        .where(MovieRatingStats.rating_count >= min_count)
+        .order_by(col(MovieRatingStats.average).desc(), col(MovieRatingStats.movie_id).desc())
+        .limit(k)
+    )
+    return list(session.exec(statement).all())
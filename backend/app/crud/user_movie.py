@@ -1,11 +1,22 @@
+from app.crud.popularity import record_popularity_like, record_popularity_unlike
+from app.models.recommendation import UserRecommendation
 from app.models.user_movie import UserMovie
 
 from app.api.deps import SessionDep, CurrentUser
+from app.recommender.cache import recommendation_cache
+from app.recommender.cooccurrence import record_like, record_unlike
 
 import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+def _discard_precomputed(session: SessionDep, user_id: int) -> None:
+    # 离线预计算的推荐已经过时，删掉后接口会回退到在线计算
+    precomputed = session.get(UserRecommendation, user_id)
+    if precomputed is not None:
+        session.delete(precomputed)
+
+
 def add_userMovie(*, session: SessionDep, current_user: CurrentUser, movie_id: int) -> UserMovie:
     """
     Add a movie id to movies in usermovie table
@@ -14,13 +25,22 @@ def add_userMovie(*, session: SessionDep, current_user: CurrentUser, movie_id: i
     if not user_movie:
         raise ValueError(f"UserMovie with User ID {current_user.id} not found")
 
-    if movie_id not in user_movie.movies:
+    likes_before = list(user_movie.movies)
+    added = movie_id not in likes_before
+    if added:
         user_movie.movies.append(movie_id)
+        _discard_precomputed(session, current_user.id)
+        record_popularity_like(session, movie_id)
 
     session.add(user_movie)
     session.commit()
     session.refresh(user_movie)
 
+    # 增量更新推荐模型并让该用户的推荐缓存失效，新的点赞立即影响推荐结果
+    if added:
+        record_like(likes_before, movie_id)
+        recommendation_cache.invalidate(current_user.id)
+
     return user_movie
 
 
@@ -32,12 +52,19 @@ def remove_userMovie(*, session: SessionDep, current_user: CurrentUser, movie_id
     if not user_movie:
         raise ValueError(f"UserMovie with User ID {current_user.id} not found")
     
-    if movie_id in user_movie.movies:
+    removed = movie_id in user_movie.movies
+    if removed:
         user_movie.movies.remove(movie_id)
+        _discard_precomputed(session, current_user.id)
+        record_popularity_unlike(session, movie_id)
     
     session.add(user_movie)
     session.commit()
     session.refresh(user_movie)
 
+    if removed:
+        record_unlike(user_movie.movies, movie_id)
+        recommendation_cache.invalidate(current_user.id)
+
     return user_movie
 
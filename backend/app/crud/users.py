@@ -3,6 +3,7 @@ from typing import Any
 from sqlmodel import Session, select
 
 from app.core.security import get_password_hash, verify_password
+from app.crud.counts import invalidate_counts
 from app.models.user import User, UserCreate, UserUpdate
 
 
@@ -12,6 +13,7 @@ def create_user(*, session: Session, user_create: UserCreate) -> User:
     )
     session.add(db_obj)
     session.commit()
+    invalidate_counts(User)
     session.refresh(db_obj)
     return db_obj
 
@@ -0,0 +1,134 @@
+"""
+下载电影海报并生成本地缩略图（app/core/posters.py），之后前端从 /posters/{key}/{size} 加载，不再直连外部图片。
+
+    python -m app.fetch_posters --workers 16
+
+只处理还没有 poster_key 的电影，可以随时中断后重新运行；同一批里相同的海报地址只下载一次。
+下载失败且不值得重试（4xx、不是图片）的电影记为空字符串，临时错误的留到下次运行。
+"""
+import argparse
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+from PIL import Image, UnidentifiedImageError
+from sqlalchemy import text
+from sqlmodel import Session, col, select
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_random_exponential
+
+from app.core.config import settings
+from app.core.db import engine
+from app.core.omdb import is_transient_error
+from app.core.posters import PosterStore, poster_store
+from app.models.omdb_movie import Movie
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+BATCH_SIZE = 500
+
+
+class PosterFetcher:
+    def __init__(self, store: PosterStore, max_connections: int) -> None:
+        self.store = store
+        self._client = httpx.Client(
+            timeout=20.0,
+            follow_redirects=True,
+            limits=httpx.Limits(
+                max_connections=max_connections, max_keepalive_connections=max_connections
+            ),
+        )
+
+    def close(self) -> None:
+        self._client.close()
+
+    def __enter__(self) -> "PosterFetcher":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    @retry(
+        retry=retry_if_exception(is_transient_error),
+        wait=wait_random_exponential(multiplier=0.5, max=30),
+        stop=stop_after_attempt(settings.OMDB_MAX_ATTEMPTS),
+        reraise=True,
+    )
+    def _download(self, url: str) -> bytes:
+        response = self._client.get(url)
+        response.raise_for_status()
+        return response.content
+
+    def fetch(self, url: str) -> str | None:
+        """
+        Download and store one poster; its key, "" if it can never be fetched, None on a transient failure
+        """
+        try:
+            return self.store.save(self._download(url))
+        except httpx.HTTPError as e:
+            if is_transient_error(e):
+                logger.warning("Failed to fetch poster %s: %s", url, type(e).__name__)
+                return None
+            logger.info("Poster not available %s: %s", url, e)
+            return ""
+        except (UnidentifiedImageError, Image.DecompressionBombError, Image.DecompressionBombWarning) as e:
+            # 不是图片或像素数超过 Pillow 上限（解压炸弹）；写缩略图时的磁盘错误不在这里处理，直接中止运行
+            logger.info("Poster is not an image %s: %s", url, e)
+            return ""
+
+
+def fetch_posters(workers: int = settings.POSTER_CONCURRENCY, store: PosterStore = poster_store) -> None:
+    start = time.perf_counter()
+    last_id = 0
+    stored = failed = deferred = 0
+    with PosterFetcher(store, workers) as fetcher, ThreadPoolExecutor(workers) as pool, Session(engine) as session:
+        while True:
+            rows = session.exec(
+                select(Movie.id, Movie.poster)
+                .where(col(Movie.poster_key).is_(None))
+                .where(col(Movie.poster).like("http%"))
+                .where(col(Movie.id) > last_id)
+                .order_by(col(Movie.id))
+                .limit(BATCH_SIZE)
+            ).all()
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            urls = list({poster for _, poster in rows})
+            keys = dict(zip(urls, pool.map(fetcher.fetch, urls)))
+            updates = [
+                {"id": movie_id, "poster": poster, "key": keys[poster]}
+                for movie_id, poster in rows
+                if keys[poster] is not None
+            ]
+            if updates:
+                # 下载期间 poster 可能已被修改（poster_key 随之重置），这时不能把旧图片的 key 写给新地址
+                session.execute(
+                    text(
+                        "UPDATE movie SET poster_key = :key, version = version + 1 "
+                        "WHERE id = :id AND poster = :poster"
+                    ),
+                    updates,
+                )
+                session.commit()
+            stored += sum(1 for u in updates if u["key"])
+            failed += sum(1 for u in updates if not u["key"])
+            deferred += len(rows) - len(updates)
+    elapsed = time.perf_counter() - start
+    logger.info(
+        "Posters: %d stored, %d unavailable, %d left for the next run, in %.2fs",
+        stored, failed, deferred, elapsed,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Download movie posters into the local thumbnail store")
+    parser.add_argument("--workers", type=int, default=settings.POSTER_CONCURRENCY)
+    args = parser.parse_args()
+    fetch_posters(args.workers)
+
+
+if __name__ == "__main__":
+    main()
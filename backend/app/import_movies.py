@@ -0,0 +1,196 @@
+"""
+流式导入离线电影数据（IMDb 风格的 TSV、CSV、OMDb 格式的 JSONL，可以是 .gz 压缩文件）。
+
+    python -m app.import_movies title.basics.tsv.gz --title-types movie tvMovie
+    python -m app.import_movies movies.jsonl --batch-size 20000
+
+整个流程是生成器流水线：逐行解析 -> 映射为 MovieCreateIn 的字段 -> 按批分组 -> 每批按 imdb_id upsert，
+任何时候内存中最多只有一批数据，可以导入比内存大的文件。定期报告 rows/sec。
+重复导入同一个文件时，没有变化的电影不会被改写。
+"""
+import argparse
+import csv
+import gzip
+import io
+import json
+import logging
+import sys
+import time
+from collections.abc import Iterable, Iterator
+from functools import lru_cache
+from itertools import islice
+from pathlib import Path
+from typing import Any
+
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.core.db import engine
+from app.crud.movies import upsert_movies
+from app.models.omdb_movie import MovieCreateIn, MovieUpsertResult
+from app.models.user import User
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# 源文件的列名（小写）-> MovieCreateIn 字段；覆盖 IMDb title.basics、OMDb JSON 和字段名本身
+COLUMN_ALIASES = {
+    "tconst": "imdb_id",
+    "imdbid": "imdb_id",
+    "primarytitle": "title",
+    "startyear": "year",
+    "runtimeminutes": "runtime",
+    "genres": "genre",
+    "imdbrating": "imdb_rating",
+    "averagerating": "imdb_rating",
+    "imdbvotes": "imdb_votes",
+    "numvotes": "imdb_votes",
+    "boxoffice": "box_office",
+}
+FIELDS = set(MovieCreateIn.model_fields)
+# IMDb 数据集和 OMDb 表示缺失值的方式
+NULL_VALUES = {"", "\\N", "N/A"}
+
+
+def open_text(path: Path) -> io.TextIOBase:
+    if path.suffix == ".gz":
+        return gzip.open(path, "rt", encoding="utf-8", newline="")  # type: ignore[return-value]
+    return open(path, encoding="utf-8", newline="")
+
+
+def detect_format(path: Path) -> str:
+    suffixes = [s for s in path.suffixes if s != ".gz"]
+    suffix = suffixes[-1] if suffixes else ""
+    return {".tsv": "tsv", ".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl"}.get(suffix, "tsv")
+
+
+def parse_records(f: io.TextIOBase, fmt: str) -> Iterator[dict[str, Any]]:
+    if fmt == "jsonl":
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+    elif fmt == "csv":
+        yield from csv.DictReader(f)
+    else:
+        # IMDb 的 TSV 不使用引号，字段里可能出现单独的 "
+        yield from csv.DictReader(f, delimiter="\t", quoting=csv.QUOTE_NONE)
+
+
+@lru_cache(maxsize=1024)
+def _field_for(key: str | None) -> str | None:
+    # 每个文件只有少数几种列名，缓存起来避免每行都重新匹配
+    if key is None:
+        return None
+    name = key.lower()
+    return COLUMN_ALIASES.get(name, name if name in FIELDS else None)
+
+
+def map_record(record: dict[str, Any], title_types: set[str] | None) -> MovieCreateIn | None:
+    """
+    Map one source record to MovieCreateIn; None if it is filtered out or lacks required fields
+    """
+    if title_types and record.get("titleType", "movie") not in title_types:
+        return None
+    values: dict[str, Any] = {}
+    for key, value in record.items():
+        field = _field_for(key)
+        if field is None or value is None or field in values:
+            continue
+        value = str(value).strip()
+        if value not in NULL_VALUES:
+            values[field] = value
+
+    if "title" not in values or "imdb_id" not in values:
+        return None
+    # 统一成 OMDb 的格式
+    if "genre" in values and ", " not in values["genre"]:
+        values["genre"] = ", ".join(g.strip() for g in values["genre"].split(","))
+    if values.get("runtime", "").isdigit():
+        values["runtime"] += " min"
+    values.setdefault("year", "N/A")
+    return MovieCreateIn(**values)
+
+
+def batched(items: Iterable[MovieCreateIn], size: int) -> Iterator[list[MovieCreateIn]]:
+    iterator = iter(items)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def import_movies(
+    path: Path,
+    fmt: str,
+    owner_id: int,
+    batch_size: int,
+    title_types: set[str] | None,
+    update_existing: bool = True,
+) -> MovieUpsertResult:
+    start = time.perf_counter()
+    last_report = start
+    read = 0
+    total = MovieUpsertResult()
+
+    def counted(records: Iterable[dict[str, Any]]) -> Iterator[dict[str, Any]]:
+        nonlocal read
+        for record in records:
+            read += 1
+            yield record
+
+    with open_text(path) as f, Session(engine) as session:
+        records = counted(parse_records(f, fmt))
+        movies = (m for m in (map_record(r, title_types) for r in records) if m is not None)
+        for batch in batched(movies, batch_size):
+            result = upsert_movies(
+                session=session, movies_in=batch, owner_id=owner_id, update_existing=update_existing
+            )
+            total.inserted += result.inserted
+            total.updated += result.updated
+            total.skipped += result.skipped
+            now = time.perf_counter()
+            if now - last_report > 10:
+                logger.info("%d rows read, %.0f rows/sec", read, read / (now - start))
+                last_report = now
+
+    elapsed = time.perf_counter() - start
+    logger.info(
+        "Read %d rows in %.2fs (%.0f rows/sec): %d inserted, %d updated, %d skipped",
+        read, elapsed, read / elapsed if elapsed else 0.0,
+        total.inserted, total.updated, total.skipped,
+    )
+    return total
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Stream a TSV/CSV/JSONL movie dump into the database")
+    parser.add_argument("path", type=Path)
+    parser.add_argument("--format", choices=["tsv", "csv", "jsonl"], help="default: from the file extension")
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument(
+        "--insert-only", action="store_true", help="leave movies that already exist unchanged"
+    )
+    parser.add_argument(
+        "--title-types", nargs="*", help="keep only these IMDb titleType values, e.g. movie tvMovie"
+    )
+    args = parser.parse_args()
+
+    # IMDb 的 TSV 里个别字段很长
+    csv.field_size_limit(sys.maxsize)
+    with Session(engine) as session:
+        owner_id = session.exec(
+            select(User.id).where(User.email == settings.FIRST_SUPERUSER)
+        ).first()
+    if owner_id is None:
+        raise SystemExit("Superuser not found, run app.initial_data first")
+
+    import_movies(
+        args.path,
+        args.format or detect_format(args.path),
+        owner_id,
+        args.batch_size,
+        set(args.title_types) if args.title_types else None,
+        update_existing=not args.insert_only,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,44 +1,247 @@
-import requests
+import argparse
 import logging
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from functools import partial
+from typing import Any
 
+from psycopg.errors import DeadlockDetected
+from sqlalchemy.exc import OperationalError
 from sqlmodel import Session
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_random_exponential
 
-from app.core.movie_db import engine, init_movie
+from app.core.config import settings
+from app.crud.ingestion import (
+    finish_run,
+    read_completed_batches,
+    record_batch,
+    start_or_resume_run,
+)
+from app.crud.movies import upsert_movies
+from app.fetch_posters import fetch_posters
+from app.core.movie_db import engine, movie_create_in
+from app.core.omdb import OmdbClient, OmdbFetchError
+from app.core.omdb_cache import OmdbResponseCache
+from app.models.ingestion import IngestionBatch
+from app.models.omdb_movie import MovieCreateIn, MovieUpsertResult
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
+# httpx 在 INFO 级别会记录带 apikey 的请求 URL
+logging.getLogger("httpx").setLevel(logging.WARNING)
 
-def fetch_movie_data(title):
-    omdb_url = 'http://www.omdbapi.com/?'
-    api_key = 'd3f0c7c3'
-    params = {
-        'apikey': api_key,
-        't': title
-    }
-    response = requests.get(omdb_url, params=params)
-    if response.status_code == 200:
-        return response.json()
-    else:
-        print("Failed to fetch data:", response.status_code)
-        return -1
-    
+# 每批写入数据库的电影数量，也是检查点的粒度
+INSERT_BATCH_SIZE = 500
+# 同时处理的批数：批内的标题共用 OMDb 线程池并发请求，一批写库时其他批继续请求
+BATCH_WORKERS = 4
+
+DEFAULT_TITLES = [
+    "Inception", "The Matrix", "Interstellar", "The Shawshank Redemption", "The Godfather", "Forrest Gump",
+    "The Dark Knight", "Pulp Fiction", "Fight Club", "The Lord of the Rings: The Fellowship of the Ring",
+]
+
+
+def _fetch_title(client: OmdbClient, title: str) -> tuple[dict[str, Any] | None, bool]:
+    # (数据, 请求是否失败)；OMDb 未找到时为 (None, False)
+    try:
+        return client.fetch_by_title(title, raise_errors=True), False
+    except OmdbFetchError:
+        return None, True
+
+
+def _is_deadlock(exc: BaseException) -> bool:
+    return isinstance(exc, OperationalError) and isinstance(exc.orig, DeadlockDetected)
+
+
+# upsert 按 imdb_id 的顺序加锁，死锁只在极少数交错下出现；Postgres 回滚其中一批，整批重做
+@retry(
+    retry=retry_if_exception(_is_deadlock),
+    wait=wait_random_exponential(multiplier=0.1, max=2),
+    stop=stop_after_attempt(5),
+    reraise=True,
+)
+def _write_batch(movies_in: list[MovieCreateIn], owner_id: int) -> MovieUpsertResult:
+    with Session(engine, expire_on_commit=False) as session:
+        return upsert_movies(session=session, movies_in=movies_in, owner_id=owner_id)
 
-def add_movies(movie_titles) -> None:
-    logger.info("Adding movies data")
+
+def _run_batch(
+    client: OmdbClient,
+    fetch_pool: ThreadPoolExecutor,
+    run_id: int,
+    batch_no: int,
+    titles: list[str],
+    owner_id: int,
+) -> IngestionBatch | None:
+    """
+    Fetch and write one batch; None if some requests failed, so the batch is not checkpointed
+    """
+    start = time.perf_counter()
+    results = list(fetch_pool.map(partial(_fetch_title, client), titles))
+    movies_data = [data for data, _ in results if data is not None]
+    failed = sum(1 for _, request_failed in results if request_failed)
+    fetched = time.perf_counter()
+    movies_in = [movie_create_in(movie_data) for movie_data in movies_data]
+    transformed = time.perf_counter()
+    result = _write_batch(movies_in, owner_id)
+    written = time.perf_counter()
+    if failed:
+        # 已经取到的电影照常写入；不记录检查点，下次运行时重做这一批，只有失败的标题会再请求 OMDb
+        logger.warning(
+            "Ingestion run %d: batch %d had %d failed OMDb requests, not checkpointed",
+            run_id, batch_no, failed,
+        )
+        return None
+    # 写库已经提交后才记录检查点；两者之间中断的批会在重启后重做，upsert 保证结果相同
+    batch = IngestionBatch(
+        run_id=run_id,
+        batch_no=batch_no,
+        inserted=result.inserted,
+        updated=result.updated,
+        skipped=result.skipped,
+        # OMDb 未找到的标题
+        not_found=len(titles) - len(movies_data),
+        fetch_seconds=fetched - start,
+        transform_seconds=transformed - fetched,
+        write_seconds=written - transformed,
+    )
+    with Session(engine, expire_on_commit=False) as session:
+        record_batch(session, batch)
+    return batch
+
+
+def add_movies(
+    movie_titles: list[str],
+    workers: int = settings.OMDB_CONCURRENCY,
+    cache: OmdbResponseCache | None = None,
+    source: str = "default",
+    batch_workers: int = BATCH_WORKERS,
+    resume: bool = True,
+) -> None:
     owner_id = 1 # set superuser as default owner
-    for title in movie_titles:
-        movie_data = fetch_movie_data(title)
-        if movie_data == -1:
-            continue
-        with Session(engine) as session:
-            init_movie(session, movie_data, owner_id)
-    logger.info("Movies data added")
+    start = time.perf_counter()
+    with Session(engine, expire_on_commit=False) as session:
+        run = start_or_resume_run(
+            session, source=source, items=movie_titles, batch_size=INSERT_BATCH_SIZE, resume=resume
+        )
+        done = {batch.batch_no for batch in read_completed_batches(session, run.id)}
+    assert run.id is not None
+    if done:
+        logger.info(
+            "Resuming ingestion run %d: %d of %d batches already done",
+            run.id, len(done), run.batch_count,
+        )
+    else:
+        logger.info(
+            "Starting ingestion run %d: %d titles in %d batches",
+            run.id, run.item_count, run.batch_count,
+        )
+
+    completed: list[IngestionBatch] = []
+    incomplete = 0
+    # 多个线程共用一个 keep-alive 客户端并发请求 OMDb，整体速率由客户端的令牌桶限制
+    with (
+        OmdbClient(max_connections=workers, cache=cache) as client,
+        ThreadPoolExecutor(workers) as fetch_pool,
+        ThreadPoolExecutor(batch_workers) as batch_pool,
+    ):
+        futures: list[Future[IngestionBatch | None]] = [
+            batch_pool.submit(
+                _run_batch,
+                client,
+                fetch_pool,
+                run.id,
+                batch_no,
+                movie_titles[batch_no * INSERT_BATCH_SIZE:(batch_no + 1) * INSERT_BATCH_SIZE],
+                owner_id,
+            )
+            for batch_no in range(run.batch_count)
+            if batch_no not in done
+        ]
+        try:
+            for future in as_completed(futures):
+                batch = future.result()
+                if batch is None:
+                    incomplete += 1
+                    continue
+                completed.append(batch)
+                logger.info(
+                    "Ingestion run %d: %d of %d batches done",
+                    run.id, len(done) + len(completed), run.batch_count,
+                )
+        except BaseException:
+            # 出错或中断时不再开始新的批，正在处理的批完成后也会记录检查点
+            for future in futures:
+                future.cancel()
+            raise
+    if incomplete:
+        logger.warning(
+            "Ingestion run %d: %d batches had failed OMDb requests; run again to retry them",
+            run.id, incomplete,
+        )
+    else:
+        with Session(engine, expire_on_commit=False) as session:
+            finish_run(session, run)
+
+    elapsed = time.perf_counter() - start
+    logger.info(
+        "Ingestion run %d: %d batches done in %.2fs, %d inserted, %d updated, %d skipped, %d not found",
+        run.id, len(completed), elapsed,
+        sum(b.inserted for b in completed), sum(b.updated for b in completed),
+        sum(b.skipped for b in completed), sum(b.not_found for b in completed),
+    )
+    # 各阶段耗时是所有批相加，批之间并行，所以总和可以超过实际耗时
+    logger.info(
+        "Stage time: fetch %.2fs, transform %.2fs, write %.2fs",
+        sum(b.fetch_seconds for b in completed),
+        sum(b.transform_seconds for b in completed),
+        sum(b.write_seconds for b in completed),
+    )
+    if cache is not None:
+        stats = cache.stats()
+        logger.info(
+            "OMDb cache: %d hits, %d misses (%d expired), hit rate %.1f%%, %d stored, %d evicted",
+            stats["hits"], stats["misses"], stats["expired"], stats["hit_rate"] * 100,
+            stats["stores"], stats["evictions"],
+        )
 
 
 def main() -> None:
-    movie_titles = ["Inception", "The Matrix", "Interstellar", "The Shawshank Redemption", "The Godfather", "Forrest Gump",
-                    "The Dark Knight", "Pulp Fiction", "Fight Club", "The Lord of the Rings: The Fellowship of the Ring"]
-    add_movies(movie_titles)
+    parser = argparse.ArgumentParser(description="Fetch movies from OMDb and add them to the database")
+    parser.add_argument("--titles-file", help="file with one title per line (default: a built-in list)")
+    parser.add_argument("--workers", type=int, default=settings.OMDB_CONCURRENCY)
+    parser.add_argument("--no-cache", action="store_true", help="always fetch from OMDb")
+    parser.add_argument(
+        "--skip-posters", action="store_true", help="do not download posters (run app.fetch_posters later)"
+    )
+    parser.add_argument(
+        "--batch-workers", type=int, default=BATCH_WORKERS, help="batches fetched and written at the same time"
+    )
+    parser.add_argument(
+        "--restart", action="store_true", help="start a new run instead of resuming an unfinished one"
+    )
+    args = parser.parse_args()
+
+    movie_titles = DEFAULT_TITLES
+    if args.titles_file:
+        with open(args.titles_file, encoding="utf-8") as f:
+            movie_titles = [line.strip() for line in f if line.strip()]
+    cache = None if args.no_cache else OmdbResponseCache()
+    try:
+        add_movies(
+            movie_titles,
+            args.workers,
+            cache,
+            source=args.titles_file or "default",
+            batch_workers=args.batch_workers,
+            resume=not args.restart,
+        )
+    finally:
+        if cache is not None:
+            cache.close()
+    # 海报在导入时下载一次，之后前端只从本地缩略图加载
+    if not args.skip_posters:
+        fetch_posters()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
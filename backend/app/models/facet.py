@@ -0,0 +1,43 @@
+from sqlalchemy import ForeignKey, Index, UniqueConstraint
+from sqlmodel import Field, Column, Integer
+
+from app.models import SQLModel
+
+# 从 movie 的逗号分隔字符串拆分出来的分面类型，对应 movie 的同名列
+FACET_KINDS = ("genre", "language", "country")
+
+
+# 分面取值的查找表，例如 (genre, Sci-Fi)、(country, France)
+class Facet(SQLModel, table=True):
+    __tablename__ = "facet"
+    __table_args__ = (UniqueConstraint("kind", "name", name="uq_facet_kind_name"),)
+
+    id: int | None = Field(default=None, primary_key=True)
+    kind: str = Field(max_length=16)
+    name: str
+
+
+# 电影 <-> 分面取值。主键以 facet_id 开头：按分面筛选时在索引里直接得到按 movie_id 排序的电影，
+# 多个分面的筛选可以逐个在主键上检查；movie_id 索引用于重建某部电影的分面
+class MovieFacet(SQLModel, table=True):
+    __tablename__ = "moviefacet"
+    __table_args__ = (Index("ix_moviefacet_movie_id", "movie_id"),)
+
+    facet_id: int | None = Field(
+        default=None,
+        sa_column=Column(
+            Integer, ForeignKey("facet.id", ondelete="CASCADE"), primary_key=True
+        ),
+    )
+    movie_id: int | None = Field(
+        default=None,
+        sa_column=Column(
+            Integer, ForeignKey("movie.id", ondelete="CASCADE"), primary_key=True
+        ),
+    )
+
+
+# 当前筛选条件下某个分面取值的电影数量
+class FacetCountOut(SQLModel):
+    name: str
+    count: int
@@ -0,0 +1,43 @@
+from datetime import datetime
+
+from sqlalchemy import ForeignKey
+from sqlmodel import Field, Column, Integer
+
+from app.models import SQLModel
+
+
+# 一次导入任务的清单：输入按固定大小切成批，source_hash 相同且未完成的任务在重启后继续
+class IngestionRun(SQLModel, table=True):
+    __tablename__ = "ingestionrun"
+
+    id: int | None = Field(default=None, primary_key=True)
+    # 输入的描述（例如标题文件路径）和内容的 sha256，用于判断重启后是不是同一份输入
+    source: str
+    source_hash: str = Field(index=True, max_length=64)
+    item_count: int
+    batch_size: int
+    batch_count: int
+    started_at: datetime = Field(default_factory=datetime.utcnow)
+    # NULL 表示还没有完成
+    finished_at: datetime | None = None
+
+
+# 已完成的批次（检查点），每批写库提交之后记录，以及该批各阶段的耗时
+class IngestionBatch(SQLModel, table=True):
+    __tablename__ = "ingestionbatch"
+
+    run_id: int | None = Field(
+        default=None,
+        sa_column=Column(
+            Integer, ForeignKey("ingestionrun.id", ondelete="CASCADE"), primary_key=True
+        ),
+    )
+    batch_no: int = Field(primary_key=True)
+    inserted: int = 0
+    updated: int = 0
+    skipped: int = 0
+    not_found: int = 0
+    fetch_seconds: float = 0.0
+    transform_seconds: float = 0.0
+    write_seconds: float = 0.0
+    completed_at: datetime = Field(default_factory=datetime.utcnow)
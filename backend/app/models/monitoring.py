@@ -0,0 +1,17 @@
+from app.models import SQLModel
+
+
+# 当前 worker 进程的数据库连接池状态（app/core/engine.py），用于判断连接池大小是否合适
+class DbPoolStats(SQLModel):
+    pid: int
+    pool_size: int
+    max_overflow: int
+    # 正在被请求使用的连接 / 池中空闲的连接 / 超出 pool_size 临时建立的连接
+    checked_out: int
+    checked_in: int
+    overflow: int
+    timeout: float
+    # 进程启动以来的累计值：新建连接数、取出连接次数、因失效被丢弃的连接数
+    connects: int = 0
+    checkouts: int = 0
+    invalidations: int = 0
@@ -1,5 +1,8 @@
-from sqlmodel import SQLModel, Field, Relationship
+from sqlalchemy import BigInteger, Computed, Float, Index
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlmodel import SQLModel, Field, Relationship, Column, Integer
 from typing import Optional
+from app.models.facet import FacetCountOut
 from app.models.user import User
 
 # 基本属性
@@ -20,7 +23,7 @@ class MovieBase(SQLModel):
     poster: str | None = None
     imdb_rating: str | None = None
     imdb_votes: str | None = None
-    imdb_id: str
+    imdb_id: str = Field(unique=True, index=True)
     metascore: str | None = None
     box_office: str | None = None
     production: str | None = None
@@ -54,22 +57,160 @@ class MovieCreateIn(MovieBase):
 class MovieUpdateIn(MovieBase):
     title: str | None = None
 
+# 从 OMDb 的字符串字段解析出的数值，作为数据库的生成列（STORED），写入/更新电影时由数据库计算，
+# 无法解析的值（"N/A"、空字符串等）为 NULL。正则先校验格式，保证类型转换不会失败
+YEAR_NUM_SQL = "CAST(substring(year FROM '^[0-9]{4}') AS integer)"
+RUNTIME_NUM_SQL = "CAST(substring(runtime FROM '^([0-9]{1,5}) min') AS integer)"
+IMDB_RATING_NUM_SQL = (
+    "CASE WHEN imdb_rating ~ '^[0-9]{1,2}(\\.[0-9]+)?$' "
+    "THEN CAST(imdb_rating AS double precision) END"
+)
+IMDB_VOTES_NUM_SQL = (
+    "CASE WHEN imdb_votes ~ '^([0-9]{1,9}|[0-9]{1,3}(,[0-9]{3}){1,2})$' "
+    "THEN CAST(replace(imdb_votes, ',', '') AS integer) END"
+)
+METASCORE_NUM_SQL = "CAST(substring(metascore FROM '^[0-9]{1,3}$') AS integer)"
+BOX_OFFICE_NUM_SQL = (
+    "CASE WHEN box_office ~ '^\\$[0-9]{1,3}(,[0-9]{3}){0,5}$' "
+    "THEN CAST(replace(substring(box_office FROM 2), ',', '') AS bigint) END"
+)
+
+# 全文搜索向量，权重：标题 A，导演和演员 B，类型 C，剧情 D（排序时标题命中最重要）
+SEARCH_CONFIG = "english"
+SEARCH_VECTOR_SQL = (
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(title, '')), 'A') || "
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(director, '') || ' ' || coalesce(actors, '')), 'B') || "
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(genre, '')), 'C') || "
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(plot, '')), 'D')"
+)
+
+
 # 数据库模型，表名由类名推导
 class Movie(MovieBase, table=True):
     __tablename__ = "movie"
+    # (列, id) 的组合索引：范围筛选和按该列排序分页都可以直接走索引，id 保证排序稳定
+    __table_args__ = (
+        Index("ix_movie_year_num", "year_num", "id"),
+        Index("ix_movie_runtime_num", "runtime_num", "id"),
+        Index("ix_movie_imdb_rating_num", "imdb_rating_num", "id"),
+        Index("ix_movie_imdb_votes_num", "imdb_votes_num", "id"),
+        Index("ix_movie_metascore_num", "metascore_num", "id"),
+        Index("ix_movie_box_office_num", "box_office_num", "id"),
+        # 普通用户只能列出自己的电影，按 id 翻页
+        Index("ix_movie_owner_id", "owner_id", "id"),
+        Index("ix_movie_search_vector", "search_vector", postgresql_using="gin"),
+    )
+    __mapper_args__ = {"exclude_properties": ["search_vector"]}
 
     id: Optional[int] = Field(default=None, primary_key=True)
-    ratings: str = Field(default="") # ratings store as the str and separate by ','
+    # 本地海报缩略图的 key（app/core/posters.py），由 app.fetch_posters 填写；
+    # 空字符串表示海报无法下载，poster 改变时重置为 NULL
+    poster_key: str | None = Field(default=None, max_length=64)
+    # 每次修改电影时加一，用于生成 ETag（app/api/etag.py）；所有更新 movie 的地方都要维护它
+    version: int = Field(
+        default=1, sa_column=Column(Integer, nullable=False, server_default="1")
+    )
+
+    year_num: int | None = Field(default=None, sa_column=Column(Integer, Computed(YEAR_NUM_SQL)))
+    runtime_num: int | None = Field(default=None, sa_column=Column(Integer, Computed(RUNTIME_NUM_SQL)))
+    imdb_rating_num: float | None = Field(
+        default=None, sa_column=Column(Float, Computed(IMDB_RATING_NUM_SQL))
+    )
+    imdb_votes_num: int | None = Field(
+        default=None, sa_column=Column(Integer, Computed(IMDB_VOTES_NUM_SQL))
+    )
+    metascore_num: int | None = Field(
+        default=None, sa_column=Column(Integer, Computed(METASCORE_NUM_SQL))
+    )
+    box_office_num: int | None = Field(
+        default=None, sa_column=Column(BigInteger, Computed(BOX_OFFICE_NUM_SQL))
+    )
+    # 生成列，写入/更新时由数据库维护；不映射到模型属性，读取电影时不会加载，查询时用 movie_search_vector
+    search_vector: str | None = Field(
+        default=None, sa_column=Column(TSVECTOR, Computed(SEARCH_VECTOR_SQL))
+    )
 
     owner_id: int | None = Field(default=None, foreign_key="user.id", nullable=False)
     owner: User | None = Relationship(back_populates="movies")
 
+movie_search_vector = Movie.__table__.c.search_vector  # type: ignore[attr-defined]
+
 # API 返回模型，id 总是必需的
 class MoviePublicOut(MovieBase):
     id: int
     owner_id: int
+    poster_key: str | None = None
+    year_num: int | None = None
+    runtime_num: int | None = None
+    imdb_rating_num: float | None = None
+    imdb_votes_num: int | None = None
+    metascore_num: int | None = None
+    box_office_num: int | None = None
 
 # API 返回的列表模型
 class MoviesPublicOut(SQLModel):
     data: list[MoviePublicOut]
+    # 总数，计算方式由列表接口的 count_mode 决定（app/crud/counts.py）；count_mode=none 时为 None
+    count: int | None
+    # 游标分页时下一页的游标，没有更多数据时为 None
+    next_cursor: str | None = None
+    # 分面类型 -> 匹配的电影中最常见的取值及数量，只在 include_facets=true 时返回
+    facets: dict[str, list[FacetCountOut]] | None = None
+
+# 列表卡片需要的列，列表接口 fields=card 时只查询和返回这些列
+MOVIE_CARD_FIELDS = ("id", "title", "year", "poster", "poster_key", "imdb_rating")
+
+# 列表接口用 fields 选择部分列时的返回模型，所有列都可以缺失，未选择的列不出现在结果里
+class MoviePartialOut(SQLModel):
+    id: int | None = None
+    title: str | None = None
+    year: str | None = None
+    rated: str | None = None
+    released: str | None = None
+    runtime: str | None = None
+    genre: str | None = None
+    director: str | None = None
+    writer: str | None = None
+    actors: str | None = None
+    plot: str | None = None
+    language: str | None = None
+    country: str | None = None
+    awards: str | None = None
+    poster: str | None = None
+    imdb_rating: str | None = None
+    imdb_votes: str | None = None
+    imdb_id: str | None = None
+    metascore: str | None = None
+    box_office: str | None = None
+    production: str | None = None
+    website: str | None = None
+    owner_id: int | None = None
+    poster_key: str | None = None
+    year_num: int | None = None
+    runtime_num: int | None = None
+    imdb_rating_num: float | None = None
+    imdb_votes_num: int | None = None
+    metascore_num: int | None = None
+    box_office_num: int | None = None
+
+class MoviesPartialOut(SQLModel):
+    data: list[MoviePartialOut]
+    count: int | None
+    next_cursor: str | None = None
+    facets: dict[str, list[FacetCountOut]] | None = None
+
+# 批量 upsert 的结果统计
+class MovieUpsertResult(SQLModel):
+    inserted: int = 0
+    updated: int = 0
+    skipped: int = 0
+
+# 相似电影结果，只包含 id 和相似度，由 ANN 索引直接返回
+class SimilarMovieOut(SQLModel):
+    id: int
+    score: float
+
+class SimilarMoviesOut(SQLModel):
+    movie_id: int
+    data: list[SimilarMovieOut]
     count: int
@@ -0,0 +1,33 @@
+from datetime import datetime
+from typing import List
+
+from sqlalchemy import Float, ForeignKey, Index, String
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlmodel import Field, Column, Integer
+
+from app.models import SQLModel
+
+
+# 按电影维护的点赞数和热度，点赞/取消点赞时在同一个事务里增量更新，
+# 读取热门/趋势列表只需要走索引取前 k 行，与用户数量无关
+class MoviePopularity(SQLModel, table=True):
+    __tablename__ = "moviepopularity"
+    __table_args__ = (
+        Index("ix_moviepopularity_like_count", "like_count", "movie_id"),
+        Index("ix_moviepopularity_trending_score", "trending_score"),
+        Index("ix_moviepopularity_genres", "genres", postgresql_using="gin"),
+    )
+
+    movie_id: int | None = Field(
+        default=None,
+        sa_column=Column(
+            Integer, ForeignKey("movie.id", ondelete="CASCADE"), primary_key=True
+        ),
+    )
+    like_count: int = Field(default=0)
+    # 前向衰减的热度：ln(Σ exp((t_i - epoch) / tau))，t_i 为每次点赞的时间。
+    # 存对数避免溢出，排序结果与当前时刻的衰减热度相同；NULL 表示没有有效的点赞
+    trending_score: float | None = Field(default=None, sa_column=Column(Float))
+    # 从 movie.genre 拆分出来，用于按类型筛选
+    genres: List[str] = Field(default=[], sa_column=Column(ARRAY(String), nullable=False))
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
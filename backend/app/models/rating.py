@@ -0,0 +1,70 @@
+from datetime import datetime
+from typing import List
+
+from sqlalchemy import Float, ForeignKey, Index
+from sqlmodel import Field, ARRAY, Column, Integer
+
+from app.models import SQLModel
+
+# 评分范围（整数），直方图按分值分桶
+RATING_MIN = 1
+RATING_MAX = 10
+
+
+# 每个用户对每部电影最多一条评分
+class Rating(SQLModel, table=True):
+    __tablename__ = "rating"
+
+    owner_id: int | None = Field(
+        default=None,
+        sa_column=Column(
+            Integer, ForeignKey("user.id", ondelete="CASCADE"), primary_key=True
+        ),
+    )
+    movie_id: int | None = Field(
+        default=None,
+        sa_column=Column(
+            Integer, ForeignKey("movie.id", ondelete="CASCADE"), primary_key=True, index=True
+        ),
+    )
+    score: int
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+# 每部电影的评分汇总，评分/取消评分时增量维护，读取时不需要扫描 rating 表
+class MovieRatingStats(SQLModel, table=True):
+    __tablename__ = "movieratingstats"
+    __table_args__ = (
+        Index("ix_movieratingstats_average", "average", "movie_id"),
+    )
+
+    movie_id: int | None = Field(
+        default=None,
+        sa_column=Column(
+            Integer, ForeignKey("movie.id", ondelete="CASCADE"), primary_key=True
+        ),
+    )
+    rating_count: int = Field(default=0)
+    rating_sum: int = Field(default=0)
+    # histogram[i] 为评分 RATING_MIN + i 的人数
+    histogram: List[int] = Field(default=[], sa_column=Column(ARRAY(Integer), nullable=False))
+    # rating_sum / rating_count，单独存一列以便按平均分排序走索引；没有评分时为 NULL
+    average: float | None = Field(default=None, sa_column=Column(Float))
+
+
+# 评分时提交的数据
+class RatingIn(SQLModel):
+    score: int = Field(ge=RATING_MIN, le=RATING_MAX)
+
+
+class RatingPublicOut(SQLModel):
+    movie_id: int
+    score: int
+    updated_at: datetime
+
+
+class MovieRatingStatsOut(SQLModel):
+    movie_id: int
+    rating_count: int
+    average: float | None
+    histogram: List[int]
@@ -0,0 +1,35 @@
+from datetime import datetime
+
+from sqlalchemy import ForeignKey
+from sqlmodel import Field, ARRAY, Column, Integer
+
+from app.models import SQLModel
+
+
+# 离线批量预计算的每个用户的 top-N 推荐，由 app/precompute_recommendations.py 写入
+class UserRecommendation(SQLModel, table=True):
+    __tablename__ = "userrecommendation"
+
+    owner_id: int | None = Field(
+        default=None,
+        sa_column=Column(
+            Integer, ForeignKey("user.id", ondelete="CASCADE"), primary_key=True
+        ),
+    )
+    movies: list[int] = Field(default=[], sa_column=Column(ARRAY(Integer), nullable=False))
+    # 生成推荐所用的模型：als / cooccurrence
+    source: str
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+# 推荐结果缓存的统计信息，用于评估缓存大小是否合适
+class RecommendationCacheStats(SQLModel):
+    size: int
+    max_size: int
+    ttl_seconds: float
+    hits: int
+    misses: int
+    hit_rate: float
+    evictions: int
+    expirations: int
+    invalidations: int
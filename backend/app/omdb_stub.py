@@ -0,0 +1,148 @@
+"""
+本地的 OMDb 模拟服务，用于测试导入流程而不访问真实 API（也不消耗 API 配额）。
+
+    python -m app.omdb_stub --port 8081 --latency 0.05 --error-rate 0.05 --rate-limit 100
+    OMDB_API_URL=http://127.0.0.1:8081/ python -m app.initial_movie --titles-file titles.txt
+
+按标题确定性地生成电影数据（同一标题每次返回相同的 imdbID），可以模拟网络延迟、
+随机 503 错误和超过速率限制时的 429；标题以 "missing" 开头时返回未找到。
+i= 按 imdbID 查询本进程之前按标题返回过的电影，其他 id 返回未找到。
+"""
+import argparse
+import json
+import logging
+import random
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from urllib.parse import parse_qs, urlparse
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+NOT_FOUND = {"Response": "False", "Error": "Movie not found!"}
+GENRES = ["Action", "Comedy", "Drama", "Sci-Fi", "Thriller", "Romance", "Horror", "Animation"]
+
+
+def fake_movie(title: str) -> dict[str, Any]:
+    seed = zlib.crc32(title.encode("utf-8"))
+    rng = random.Random(seed)
+    return {
+        "Title": title,
+        "Year": str(rng.randint(1950, 2024)),
+        "Rated": rng.choice(["G", "PG", "PG-13", "R"]),
+        "Released": f"{rng.randint(1, 28):02d} Jan {rng.randint(1950, 2024)}",
+        "Runtime": f"{rng.randint(80, 180)} min",
+        "Genre": ", ".join(rng.sample(GENRES, rng.randint(1, 3))),
+        "Director": f"Director {seed % 1000}",
+        "Writer": f"Writer {seed % 997}",
+        "Actors": ", ".join(f"Actor {rng.randint(1, 5000)}" for _ in range(3)),
+        "Plot": f"A stub plot for {title}.",
+        "Language": "English",
+        "Country": "USA",
+        "Awards": "N/A",
+        "Poster": "N/A",
+        "Ratings": [],
+        "Metascore": str(rng.randint(20, 100)),
+        "imdbRating": f"{rng.randint(10, 99) / 10:.1f}",
+        "imdbVotes": f"{rng.randint(100, 2_000_000):,}",
+        "imdbID": f"tt{seed % 10_000_000:07d}",
+        "Type": "movie",
+        "BoxOffice": "N/A",
+        "Production": "N/A",
+        "Website": "N/A",
+        "Response": "True",
+    }
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    # 由 main() 设置
+    latency = 0.0
+    error_rate = 0.0
+    rate_limit = 0.0
+    _window_start = 0.0
+    _window_count = 0
+    _lock = threading.Lock()
+    # imdbID -> 按标题返回过的标题，用于 i= 查询
+    _titles: dict[str, str] = {}
+
+    protocol_version = "HTTP/1.1"
+
+    def _over_rate_limit(self) -> bool:
+        if self.rate_limit <= 0:
+            return False
+        cls = type(self)
+        with cls._lock:
+            now = time.monotonic()
+            if now - cls._window_start >= 1:
+                cls._window_start = now
+                cls._window_count = 0
+            cls._window_count += 1
+            return cls._window_count > self.rate_limit
+
+    def _send(self, status: int, body: dict[str, Any]) -> None:
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self) -> None:
+        if self.latency:
+            time.sleep(self.latency)
+        if self._over_rate_limit():
+            self._send(429, {"Response": "False", "Error": "Request limit reached!"})
+            return
+        if random.random() < self.error_rate:
+            self._send(503, {"Response": "False", "Error": "Service unavailable"})
+            return
+
+        params = parse_qs(urlparse(self.path).query)
+        if not params.get("apikey"):
+            self._send(401, {"Response": "False", "Error": "No API key provided."})
+            return
+        if "i" in params:
+            with self._lock:
+                title = self._titles.get(params["i"][0])
+            self._send(200, NOT_FOUND if title is None else fake_movie(title))
+            return
+        title = params.get("t", [""])[0]
+        if not title or title.lower().startswith("missing"):
+            self._send(200, NOT_FOUND)
+            return
+        movie = fake_movie(title)
+        with self._lock:
+            self._titles[movie["imdbID"]] = title
+        self._send(200, movie)
+
+    def log_message(self, format: str, *args: object) -> None:
+        logger.debug(format, *args)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run a local stub of the OMDb API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 503")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="requests/sec before answering 429")
+    args = parser.parse_args()
+
+    StubHandler.latency = args.latency
+    StubHandler.error_rate = args.error_rate
+    StubHandler.rate_limit = args.rate_limit
+    server = ThreadingHTTPServer((args.host, args.port), StubHandler)
+    logger.info("OMDb stub listening on http://%s:%d/", args.host, args.port)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
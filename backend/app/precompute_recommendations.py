@@ -0,0 +1,168 @@
+"""
+离线批量预计算每个用户的 top-N 推荐，写入 userrecommendation 表。
+
+    python -m app.precompute_recommendations --source als --top-n 100 --workers 8
+
+按 owner_id 分批（keyset 分页）从 usermovie 读取用户，同时最多只有 workers * 2 批在处理中，
+内存占用与用户总数无关；打分在进程池中完成，结果按批 upsert，并定期报告吞吐量（users/sec）。
+"""
+import argparse
+import logging
+import multiprocessing as mp
+import os
+import time
+from collections import deque
+from collections.abc import Iterator
+from datetime import datetime
+from multiprocessing.pool import AsyncResult
+
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.core.db import engine
+from app.models.recommendation import UserRecommendation
+from app.models.user_movie import UserMovie
+from app.recommender.als import AlsModel, als_model_path
+from app.recommender.cooccurrence import CooccurrenceModel, build_cooccurrence_model
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+Batch = list[tuple[int, list[int]]]
+
+# fork 出来的子进程直接继承打分模型，不需要序列化
+_model: AlsModel | CooccurrenceModel | None = None
+_top_n = 100
+
+
+def iter_user_batches(session: Session, batch_size: int) -> Iterator[Batch]:
+    """
+    Yield (owner_id, likes) batches ordered by owner_id, using keyset pagination
+    """
+    last_id = 0
+    while True:
+        statement = (
+            select(UserMovie.owner_id, UserMovie.movies)
+            .where(UserMovie.owner_id > last_id)
+            .order_by(UserMovie.owner_id)
+            .limit(batch_size)
+        )
+        rows = session.exec(statement).all()
+        if not rows:
+            return
+        last_id = rows[-1][0]
+        # 没有点赞的用户留给接口的冷启动逻辑处理
+        batch = [(owner_id, list(movies)) for owner_id, movies in rows if movies]
+        if batch:
+            yield batch
+
+
+def score_batch(batch: Batch) -> list[tuple[int, list[int]]]:
+    assert _model is not None
+    if isinstance(_model, AlsModel):
+        user_ids = [owner_id for owner_id, _ in batch]
+        likes = [movies for _, movies in batch]
+        results = _model.recommend_batch(user_ids, likes, _top_n)
+        return [(owner_id, ids) for owner_id, ids in zip(user_ids, results, strict=True) if ids]
+    return [
+        (owner_id, ids)
+        for owner_id, movies in batch
+        if (ids := _model.recommend(movies, _top_n))
+    ]
+
+
+def save_batch(session: Session, results: list[tuple[int, list[int]]], source: str) -> None:
+    if not results:
+        return
+    now = datetime.utcnow()
+    statement = insert(UserRecommendation).values(
+        [
+            {"owner_id": owner_id, "movies": ids, "source": source, "created_at": now}
+            for owner_id, ids in results
+        ]
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=["owner_id"],
+        set_={
+            "movies": statement.excluded.movies,
+            "source": statement.excluded.source,
+            "created_at": statement.excluded.created_at,
+        },
+    )
+    session.exec(statement)  # type: ignore
+    session.commit()
+
+
+def precompute(source: str, top_n: int, batch_size: int, workers: int) -> None:
+    global _model, _top_n
+    _top_n = top_n
+    if source == "als":
+        _model = AlsModel.load(als_model_path())
+    else:
+        with Session(engine) as session:
+            _model = build_cooccurrence_model(session)
+
+    # 模型准备好之后再 fork，子进程直接继承；继承的数据库连接由 app/core/engine.py 在 fork 后丢弃
+    pool = mp.get_context("fork").Pool(workers) if workers > 1 else None
+    pending: deque[AsyncResult] = deque()
+    start = time.perf_counter()
+    last_report = start
+    users = 0
+    written = 0
+    try:
+        with Session(engine) as session:
+            for batch in iter_user_batches(session, batch_size):
+                users += len(batch)
+                if pool is None:
+                    results = score_batch(batch)
+                    save_batch(session, results, source)
+                    written += len(results)
+                else:
+                    pending.append(pool.apply_async(score_batch, (batch,)))
+                    # 限制同时在处理中的批次数，保证内存有上界
+                    while len(pending) >= workers * 2 or (pending and pending[0].ready()):
+                        results = pending.popleft().get()
+                        save_batch(session, results, source)
+                        written += len(results)
+
+                now = time.perf_counter()
+                if now - last_report > 10:
+                    logger.info("%d users scored, %.0f users/sec", users, users / (now - start))
+                    last_report = now
+
+            while pending:
+                results = pending.popleft().get()
+                save_batch(session, results, source)
+                written += len(results)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    elapsed = time.perf_counter() - start
+    logger.info(
+        "Precomputed %d users (%d written) from %s in %.2fs, %.0f users/sec",
+        users, written, source, elapsed, users / elapsed if elapsed else 0.0,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Precompute top-N recommendations per user")
+    parser.add_argument(
+        "--source",
+        choices=["als", "cooccurrence"],
+        default="als" if als_model_path().exists() else "cooccurrence",
+    )
+    parser.add_argument("--top-n", type=int, default=settings.PRECOMPUTE_TOP_N)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    logger.info("Precomputing recommendations")
+    precompute(args.source, args.top_n, args.batch_size, args.workers)
+    logger.info("Recommendations precomputed")
+
+
+if __name__ == "__main__":
+    main()
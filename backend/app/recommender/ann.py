@@ -0,0 +1,263 @@
+"""
+纯 NumPy 实现的 IVF（倒排文件）近似最近邻索引，用于电影向量的余弦相似度检索。
+
+build：在样本上做球面 k-means 得到 n_lists 个聚类中心，再把所有向量分配到最近的中心，
+       按聚类连续存放（vectors[offsets[c]:offsets[c + 1]] 就是第 c 个聚类）。
+query：先算查询向量和所有中心的相似度，只在最近的 n_probe 个聚类里做精确打分。
+n_probe 越大召回越高、延迟越大；n_probe == n_lists 时等价于暴力搜索。
+
+索引保存为一个目录下的若干 .npy 文件，加载时用 mmap，多个 worker 进程共享同一份页缓存。
+每次保存写入一个新的目录（movie_ivf.<时间戳>），再把符号链接 movie_ivf 原子地指向它，
+加载方不会读到新旧两次构建混在一起的文件。
+
+直接运行 `python -m app.recommender.ann` 会从数据库构建内容向量并保存索引。
+"""
+import json
+import logging
+import math
+import os
+import shutil
+import time
+from collections.abc import Sequence
+from pathlib import Path
+
+import numpy as np
+import scipy.sparse as sp
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.core.db import engine
+from app.recommender.content import build_content_index
+from app.recommender.utils import top_k_indices
+
+logger = logging.getLogger(__name__)
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class IVFIndex:
+    def __init__(self, n_lists: int | None = None, n_probe: int = 16) -> None:
+        # n_lists 为 None 时按数据量自动选择（约 4 * sqrt(n)）
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.centroids = np.zeros((0, 0), dtype=np.float32)
+        self.vectors = np.zeros((0, 0), dtype=np.float32)
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.offsets = np.zeros(1, dtype=np.int64)
+        # 按 id 排序后的行号，用于由 movie id 找到它自己的向量
+        self._id_order = np.zeros(0, dtype=np.int64)
+
+    @property
+    def size(self) -> int:
+        return int(self.ids.size)
+
+    @property
+    def dim(self) -> int:
+        return int(self.vectors.shape[1]) if self.vectors.ndim == 2 else 0
+
+    def _assign(self, vectors: np.ndarray, chunk_size: int = 65_536) -> np.ndarray:
+        # 分块计算每个向量最近的中心，避免生成 n x n_lists 的大矩阵
+        labels = np.empty(vectors.shape[0], dtype=np.int64)
+        for start in range(0, vectors.shape[0], chunk_size):
+            chunk = vectors[start : start + chunk_size]
+            labels[start : start + chunk_size] = np.argmax(chunk @ self.centroids.T, axis=1)
+        return labels
+
+    def build(
+        self,
+        ids: Sequence[int] | np.ndarray,
+        vectors: np.ndarray,
+        n_iter: int = 10,
+        sample_size: int | None = None,
+        seed: int = 0,
+    ) -> "IVFIndex":
+        """
+        Cluster the vectors with spherical k-means and lay them out list by list
+        """
+        vectors = normalize(vectors)
+        ids = np.asarray(ids, dtype=np.int64)
+        n = vectors.shape[0]
+        if n == 0:
+            # 空的电影库：没有可以训练的样本，得到一个空索引，search 总是返回空列表
+            self.n_lists = 0
+            self.centroids = np.zeros((0, vectors.shape[-1]), dtype=np.float32)
+            self.vectors = vectors.reshape(0, vectors.shape[-1])
+            self.ids = ids
+            self.offsets = np.zeros(1, dtype=np.int64)
+            self._id_order = np.zeros(0, dtype=np.int64)
+            return self
+        n_lists = self.n_lists or max(1, int(4 * math.sqrt(n)))
+        n_lists = min(n_lists, max(n, 1))
+        self.n_lists = n_lists
+
+        rng = np.random.default_rng(seed)
+        # k-means 只在样本上训练，每个中心约 256 个样本点就足够
+        sample_size = min(n, sample_size or 256 * n_lists)
+        sample = vectors[rng.choice(n, sample_size, replace=False)] if n else vectors
+        self.centroids = sample[rng.choice(sample.shape[0], n_lists, replace=False)].copy()
+        for _ in range(n_iter):
+            labels = self._assign(sample)
+            # 用稀疏指示矩阵一次性按聚类求和
+            members = sp.csr_matrix(
+                (np.ones(labels.size, dtype=np.float32), (labels, np.arange(labels.size))),
+                shape=(n_lists, labels.size),
+            )
+            sums = np.asarray(members @ sample)
+            counts = np.bincount(labels, minlength=n_lists)
+            # 空聚类重新随机取一个样本点作为中心
+            empty = counts == 0
+            sums[empty] = sample[rng.choice(sample.shape[0], int(empty.sum()))]
+            self.centroids = normalize(sums)
+
+        labels = self._assign(vectors)
+        order = np.argsort(labels, kind="stable")
+        self.vectors = vectors[order]
+        self.ids = ids[order]
+        self.offsets = np.zeros(n_lists + 1, dtype=np.int64)
+        np.cumsum(np.bincount(labels, minlength=n_lists), out=self.offsets[1:])
+        self._id_order = np.argsort(self.ids, kind="stable")
+        return self
+
+    def _candidates(self, query: np.ndarray, n_probe: int) -> np.ndarray:
+        lists = top_k_indices(self.centroids @ query, n_probe)
+        return np.concatenate(
+            [np.arange(self.offsets[c], self.offsets[c + 1]) for c in lists]
+        )
+
+    def search(
+        self, query: np.ndarray, k: int = 10, n_probe: int | None = None, exclude: int | None = None
+    ) -> list[tuple[int, float]]:
+        """
+        Return the approximate k nearest (id, cosine) to a query vector
+        """
+        if self.size == 0:
+            return []
+        query = normalize(query)
+        rows = self._candidates(query, min(n_probe or self.n_probe, self.n_lists or 1))
+        if exclude is not None:
+            rows = rows[self.ids[rows] != exclude]
+        scores = self.vectors[rows] @ query
+        best = top_k_indices(scores, k)
+        return [(int(self.ids[rows[i]]), float(scores[i])) for i in best]
+
+    def search_exact(
+        self, query: np.ndarray, k: int = 10, exclude: int | None = None
+    ) -> list[tuple[int, float]]:
+        """
+        Brute-force search over every vector, used as ground truth for recall
+        """
+        if self.size == 0:
+            return []
+        scores = self.vectors @ normalize(query)
+        if exclude is not None:
+            scores[self.ids == exclude] = -np.inf
+        best = top_k_indices(scores, k)
+        return [(int(self.ids[i]), float(scores[i])) for i in best]
+
+    def vector_of(self, movie_id: int) -> np.ndarray | None:
+        pos = np.searchsorted(self.ids, movie_id, sorter=self._id_order)
+        if pos >= self.size:
+            return None
+        row = self._id_order[pos]
+        if self.ids[row] != movie_id:
+            return None
+        return np.asarray(self.vectors[row])
+
+    def similar(
+        self, movie_id: int, k: int = 10, n_probe: int | None = None
+    ) -> list[tuple[int, float]] | None:
+        """
+        Return the approximate k most similar movies, or None if movie_id is not indexed
+        """
+        vector = self.vector_of(movie_id)
+        if vector is None:
+            return None
+        return self.search(vector, k, n_probe=n_probe, exclude=movie_id)
+
+    def save(self, path: str | Path) -> None:
+        """
+        Write a new build directory next to path, then atomically point the path symlink at it
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        build_dir = path.parent / f"{path.name}.{time.time_ns()}"
+        build_dir.mkdir()
+        for name in ("centroids", "vectors", "ids", "offsets"):
+            np.save(build_dir / f"{name}.npy", getattr(self, name))
+        (build_dir / "meta.json").write_text(
+            json.dumps({"n_lists": self.n_lists, "n_probe": self.n_probe, "size": self.size})
+        )
+        # 以前的版本直接保存在 path 目录里，换成符号链接之前删除
+        if path.is_dir() and not path.is_symlink():
+            shutil.rmtree(path)
+        link = path.parent / f"{path.name}.tmp"
+        link.unlink(missing_ok=True)
+        link.symlink_to(build_dir.name)
+        os.replace(link, path)
+        # 保留上一次构建，正在加载它的进程不会读到一半文件被删除；更早的删除
+        # （已经 mmap 的文件删除后仍然可以读取）
+        stamps = [p.suffix[1:] for p in path.parent.glob(f"{path.name}.*")]
+        builds = sorted(int(stamp) for stamp in stamps if stamp.isdigit())
+        for old in (path.parent / f"{path.name}.{stamp}" for stamp in builds[:-2]):
+            shutil.rmtree(old)
+
+    @classmethod
+    def load(cls, path: str | Path, mmap: bool = True) -> "IVFIndex":
+        # 先解析符号链接，所有文件都从同一次构建的目录读取
+        path = Path(path).resolve()
+        meta = json.loads((path / "meta.json").read_text())
+        index = cls(n_lists=meta["n_lists"], n_probe=meta["n_probe"])
+        mode = "r" if mmap else None
+        index.centroids = np.load(path / "centroids.npy")
+        index.vectors = np.load(path / "vectors.npy", mmap_mode=mode)
+        index.ids = np.load(path / "ids.npy")
+        index.offsets = np.load(path / "offsets.npy")
+        index._id_order = np.argsort(index.ids, kind="stable")
+        return index
+
+
+def movie_index_path() -> Path:
+    return Path(settings.RECOMMENDER_DATA_DIR) / "movie_ivf"
+
+
+_loaded: tuple[str, IVFIndex] | None = None
+
+
+def get_movie_index() -> IVFIndex | None:
+    """
+    Return the saved movie index, reloading it when a newer build has been saved
+    """
+    global _loaded
+    # 每次保存都是一个新的目录，符号链接指向的目录变了就重新加载
+    build_dir = movie_index_path().resolve()
+    if not (build_dir / "meta.json").is_file():
+        return None
+    if _loaded is None or _loaded[0] != str(build_dir):
+        _loaded = (str(build_dir), IVFIndex.load(build_dir))
+    return _loaded[1]
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    with Session(engine) as session:
+        content = build_content_index(session)
+    start = time.perf_counter()
+    vectors = content.embed(settings.ANN_DIM)
+    index = IVFIndex(n_probe=settings.ANN_N_PROBE).build(content.ids, vectors)
+    index.save(movie_index_path())
+    logger.info(
+        "Movie index saved to %s: %d movies, %d lists in %.2fs",
+        movie_index_path(),
+        index.size,
+        index.n_lists,
+        time.perf_counter() - start,
+    )
+
+
+if __name__ == "__main__":
+    main()
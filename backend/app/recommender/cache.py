@@ -0,0 +1,90 @@
+"""
+进程内的按用户推荐结果缓存（LRU + TTL）。
+
+首页每次加载都会请求推荐，而用户修改点赞的频率低得多，所以把最终的响应对象按用户缓存起来，
+命中时既不访问模型也不访问数据库。用户点赞/取消点赞时由 app/crud/user_movie.py 主动失效。
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Generic, TypeVar
+
+from app.core.config import settings
+from app.models.omdb_movie import MoviesPublicOut
+from app.models.recommendation import RecommendationCacheStats
+
+V = TypeVar("V")
+
+
+class RecommendationCache(Generic[V]):
+    def __init__(self, max_size: int, ttl: float) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+        # user_id -> (过期时间, 缓存时的 k, 结果)，按最近使用排序
+        self._entries: OrderedDict[int, tuple[float, int, V]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, user_id: int, k: int) -> tuple[int, V] | None:
+        """
+        Return (cached k, value) if a fresh entry for at least k items exists
+        """
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, cached_k, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[user_id]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            if cached_k < k:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return cached_k, value
+
+    def put(self, user_id: int, k: int, value: V) -> None:
+        with self._lock:
+            self._entries[user_id] = (time.monotonic() + self.ttl, k, value)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, user_id: int) -> None:
+        with self._lock:
+            if self._entries.pop(user_id, None) is not None:
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> RecommendationCacheStats:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return RecommendationCacheStats(
+                size=len(self._entries),
+                max_size=self.max_size,
+                ttl_seconds=self.ttl,
+                hits=self.hits,
+                misses=self.misses,
+                hit_rate=self.hits / lookups if lookups else 0.0,
+                evictions=self.evictions,
+                expirations=self.expirations,
+                invalidations=self.invalidations,
+            )
+
+
+# 缓存 /movies/recommendations 的完整响应
+recommendation_cache: RecommendationCache[MoviesPublicOut] = RecommendationCache(
+    settings.RECOMMENDATION_CACHE_SIZE, settings.RECOMMENDATION_CACHE_TTL_SECONDS
+)
@@ -0,0 +1,223 @@
+"""
+基于 Movie 元数据的内容相似度引擎。
+
+genre / director / writer / actors / language / country 按逗号拆分后作为 one-hot 特征，
+plot 分词后作为词袋特征；所有特征做 TF-IDF 加权并按行 L2 归一化，
+于是两部电影的余弦相似度就是特征矩阵中对应两行的点积。
+查询时只取查询特征对应的倒排行，用一次矩阵乘法算出和整个目录的相似度，再用 argpartition 取 top-k，
+不在 Python 里逐行循环。
+"""
+import logging
+import math
+import re
+import time
+from array import array
+from collections import Counter
+from collections.abc import Iterable, Sequence
+from typing import Any
+
+import numpy as np
+import scipy.sparse as sp
+from sqlmodel import Session, select
+
+from app.models.omdb_movie import Movie
+from app.recommender.utils import top_k_rows
+
+logger = logging.getLogger(__name__)
+
+# 逗号分隔的类别字段及其权重
+CATEGORICAL_FIELDS: dict[str, float] = {
+    "genre": 1.0,
+    "director": 1.0,
+    "writer": 0.5,
+    "actors": 0.8,
+    "language": 0.3,
+    "country": 0.3,
+}
+PLOT_WEIGHT = 1.0
+# 批量查询时每次计算多少部电影的稠密相似度向量
+QUERY_CHUNK_SIZE = 4
+
+# fit() 接收的每一行的列顺序：(id, genre, director, writer, actors, language, country, plot)
+FEATURE_COLUMNS = (*CATEGORICAL_FIELDS, "plot")
+
+STOP_WORDS = frozenset(
+    """
+    a about after again against all an and any are as at be been before being
+    between both but by can could did do does doing down during each few for from
+    further had has have having he her here hers herself him himself his how i if
+    in into is it its itself just me more most my no nor not now of off on once only
+    or other our out over own same she should so some such than that the their them
+    then there these they this those through to too under until up very was we were
+    what when where which while who whom why will with would you your
+    """.split()
+)
+
+_WORD_RE = re.compile(r"[a-z0-9']+")
+# 去掉 writer 字段中的 "(screenplay)" 之类的说明
+_PAREN_RE = re.compile(r"\s*\([^)]*\)")
+
+
+def movie_features(values: Sequence[str | None]) -> dict[str, float]:
+    """
+    Turn one movie's FEATURE_COLUMNS values into weighted feature tokens
+    """
+    features: dict[str, float] = {}
+    for (field, weight), value in zip(CATEGORICAL_FIELDS.items(), values, strict=False):
+        if not value or value == "N/A":
+            continue
+        for part in _PAREN_RE.sub("", value).split(","):
+            part = part.strip().lower()
+            if part:
+                features[f"{field}:{part}"] = weight
+
+    plot = values[len(CATEGORICAL_FIELDS)]
+    if plot and plot != "N/A":
+        words = Counter(
+            w for w in _WORD_RE.findall(plot.lower()) if len(w) > 2 and w not in STOP_WORDS
+        )
+        for word, tf in words.items():
+            # sublinear tf
+            features[f"plot:{word}"] = PLOT_WEIGHT * (1.0 + math.log(tf))
+    return features
+
+
+class ContentIndex:
+    def __init__(self, min_df: int = 2, max_df: float = 0.5) -> None:
+        self.min_df = min_df
+        self.max_df = max_df
+        self.ids = np.zeros(0, dtype=np.int64)
+        # n_movies x n_features，行已 L2 归一化
+        self.matrix = sp.csr_matrix((0, 0), dtype=np.float32)
+        # matrix 的转置（倒排表），查询时 q @ postings 只会访问 q 中出现的特征
+        self.postings = sp.csr_matrix((0, 0), dtype=np.float32)
+
+    @property
+    def n_movies(self) -> int:
+        return int(self.ids.size)
+
+    def fit(self, rows: Iterable[Sequence[Any]]) -> "ContentIndex":
+        """
+        Build the TF-IDF matrix from rows of (id, *FEATURE_COLUMNS)
+        """
+        vocabulary: dict[str, int] = {}
+        ids = array("q")
+        indptr = array("q", [0])
+        indices = array("i")
+        data = array("f")
+        for row in rows:
+            ids.append(row[0])
+            for token, weight in movie_features(row[1:]).items():
+                indices.append(vocabulary.setdefault(token, len(vocabulary)))
+                data.append(weight)
+            indptr.append(len(indices))
+
+        self.ids = np.frombuffer(ids, dtype=np.int64).copy() if ids else np.zeros(0, dtype=np.int64)
+        order = np.argsort(self.ids, kind="stable")
+        matrix = sp.csr_matrix(
+            (
+                np.frombuffer(data, dtype=np.float32) if data else np.zeros(0, dtype=np.float32),
+                np.frombuffer(indices, dtype=np.int32) if indices else np.zeros(0, dtype=np.int32),
+                np.frombuffer(indptr, dtype=np.int64),
+            ),
+            shape=(self.ids.size, len(vocabulary)),
+        )[order]
+        self.ids = self.ids[order]
+
+        # 只出现一次的特征对相似度没有贡献，出现太频繁的特征（如 country:usa）区分度低且会放大查询开销
+        df = np.bincount(matrix.indices, minlength=matrix.shape[1])
+        keep = (df >= self.min_df) & (df <= self.max_df * max(self.n_movies, 1))
+        matrix = matrix[:, np.flatnonzero(keep)].tocsr()
+        df = df[keep]
+
+        idf = np.log((1.0 + self.n_movies) / (1.0 + df)) + 1.0
+        matrix.data *= idf[matrix.indices].astype(np.float32)
+        norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+        norms[norms == 0] = 1.0
+        self.matrix = sp.csr_matrix(sp.diags(1.0 / norms).dot(matrix), dtype=np.float32)
+        self.postings = self.matrix.T.tocsr()
+        return self
+
+    def embed(self, dim: int = 128, seed: int = 0) -> np.ndarray:
+        """
+        Project the sparse TF-IDF rows to dense vectors with a Gaussian random projection
+        """
+        # 随机投影近似保持余弦相似度，得到的稠密向量可以交给 ANN 索引
+        rng = np.random.default_rng(seed)
+        projection = rng.standard_normal((self.matrix.shape[1], dim), dtype=np.float32)
+        return np.asarray(self.matrix @ projection, dtype=np.float32)
+
+    def rows_of(self, movie_ids: Sequence[int]) -> np.ndarray:
+        """
+        Map movie ids to matrix rows, -1 for ids that are not indexed
+        """
+        ids = np.asarray(movie_ids, dtype=np.int64)
+        if self.n_movies == 0:
+            return np.full(ids.size, -1, dtype=np.int64)
+        rows = np.searchsorted(self.ids, ids)
+        rows[rows >= self.n_movies] = 0
+        return np.where(self.ids[rows] == ids, rows, -1)
+
+    def _scores(self, rows: np.ndarray) -> np.ndarray:
+        # 只取查询中出现的特征对应的倒排行，再做一次 CSC x dense 乘法，得到 (len(rows), n_movies) 的相似度
+        queries = self.matrix[rows]
+        features = np.unique(queries.indices)
+        postings = self.postings[features]
+        weights = queries[:, features].toarray()
+        return np.asarray((postings.T @ weights.T).T)
+
+    def similar_batch(
+        self, movie_ids: Sequence[int], k: int = 10
+    ) -> list[list[tuple[int, float]]]:
+        """
+        Return the k most similar movies (id, cosine) for each of movie_ids
+        """
+        rows = self.rows_of(movie_ids)
+        results: list[list[tuple[int, float]]] = [[] for _ in rows]
+        k = min(k, self.n_movies - 1)
+        if k <= 0:
+            return results
+
+        positions = np.flatnonzero(rows >= 0)
+        # 分块计算，限制稠密相似度矩阵的内存占用
+        for start in range(0, positions.size, QUERY_CHUNK_SIZE):
+            chunk = positions[start : start + QUERY_CHUNK_SIZE]
+            scores = self._scores(rows[chunk])
+            # 排除电影自身
+            scores[np.arange(chunk.size), rows[chunk]] = -np.inf
+            best, best_scores = top_k_rows(scores, k)
+            for position, movie_rows, values in zip(chunk, best, best_scores, strict=True):
+                results[position] = [
+                    (int(self.ids[r]), float(v))
+                    for r, v in zip(movie_rows, values, strict=True)
+                    if v > 0
+                ]
+        return results
+
+    def similar(self, movie_id: int, k: int = 10) -> list[tuple[int, float]]:
+        """
+        Return the k most similar movies (id, cosine) for a single movie
+        """
+        return self.similar_batch([movie_id], k)[0]
+
+
+def build_content_index(session: Session) -> ContentIndex:
+    """
+    Build a content index over every row of the movie table
+    """
+    start = time.perf_counter()
+    columns = [getattr(Movie, name) for name in FEATURE_COLUMNS]
+    statement = (
+        select(Movie.id, *columns)
+        .order_by(Movie.id)
+        .execution_options(yield_per=10_000)
+    )
+    index = ContentIndex().fit(session.exec(statement))
+    logger.info(
+        "Content index built: %d movies, %d features in %.2fs",
+        index.n_movies,
+        index.matrix.shape[1],
+        time.perf_counter() - start,
+    )
+    return index
+
@@ -0,0 +1,206 @@
+"""
+基于 usermovie 表中点赞数组的 item-item 共现推荐模型。
+
+相似度为二值 user x movie 矩阵上的余弦相似度：
+    sim(i, j) = co(i, j) / sqrt(n_i * n_j)
+其中 co(i, j) 为同时喜欢 i 和 j 的用户数，n_i 为喜欢 i 的用户数。
+相似度矩阵在 fit 时一次性计算，并且每一行只保留 top-N 个邻居，
+所以给一个用户推荐只需要读取其点赞电影对应的几行稀疏数据，开销与用户总数无关。
+
+点赞/取消点赞时通过 add_like / remove_like 增量更新共现计数（O(|用户点赞数|)），
+增量部分在打分时叠加到预计算的相似度上，下一次全量重建时再合并进矩阵。
+"""
+import logging
+import threading
+import time
+from array import array
+from collections import Counter, defaultdict
+from collections.abc import Iterable, Sequence
+
+import numpy as np
+import scipy.sparse as sp
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.models.user_movie import UserMovie
+from app.recommender.holder import ModelHolder
+from app.recommender.utils import top_k
+
+logger = logging.getLogger(__name__)
+
+
+class CooccurrenceModel:
+    def __init__(self, neighbors: int = 100) -> None:
+        self.neighbors = neighbors
+        # 行/列下标就是 movie.id，shape = (max_id + 1, max_id + 1)
+        self.similarity = sp.csr_matrix((0, 0), dtype=np.float32)
+        self.item_counts = np.zeros(0, dtype=np.int64)
+        self.n_users = 0
+        # 自上次 fit 以来的增量：共现计数变化和每部电影点赞数变化
+        self._delta: defaultdict[int, Counter[int]] = defaultdict(Counter)
+        self._count_delta: Counter[int] = Counter()
+        self._delta_lock = threading.Lock()
+
+    @property
+    def n_items(self) -> int:
+        return int(self.similarity.shape[0])
+
+    def fit(self, like_lists: Iterable[Sequence[int]]) -> "CooccurrenceModel":
+        """
+        Build the pruned item-item similarity matrix from an iterable of like arrays
+        """
+        # 用 array 而不是 list 存储下标，百万级用户时内存占用小得多
+        indptr = array("q", [0])
+        indices = array("i")
+        for likes in like_lists:
+            if not likes:
+                continue
+            indices.extend(set(likes))
+            indptr.append(len(indices))
+
+        cols = np.frombuffer(indices, dtype=np.int32) if indices else np.zeros(0, dtype=np.int32)
+        n_items = int(cols.max()) + 1 if cols.size else 0
+        self.n_users = len(indptr) - 1
+        user_items = sp.csr_matrix(
+            (np.ones(cols.size, dtype=np.float32), cols, np.frombuffer(indptr, dtype=np.int64)),
+            shape=(self.n_users, n_items),
+        )
+
+        co = (user_items.T @ user_items).tocsr()
+        self.item_counts = co.diagonal().astype(np.int64)
+        co.setdiag(0)
+        co.eliminate_zeros()
+
+        # 余弦归一化：对每个非零元素除以 sqrt(n_i * n_j)
+        rows = np.repeat(np.arange(n_items, dtype=np.int64), np.diff(co.indptr))
+        norms = np.sqrt(self.item_counts.astype(np.float64))
+        co.data = (co.data / (norms[rows] * norms[co.indices])).astype(np.float32)
+
+        self.similarity = self._prune(co, rows)
+        return self
+
+    def _prune(self, co: sp.csr_matrix, rows: np.ndarray) -> sp.csr_matrix:
+        # 每行按相似度降序排列，只保留前 neighbors 个
+        order = np.lexsort((-co.data, rows))
+        rank = np.arange(order.size) - co.indptr[rows[order]]
+        keep = order[rank < self.neighbors]
+        indptr = np.zeros(co.shape[0] + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows[keep], minlength=co.shape[0]), out=indptr[1:])
+        return sp.csr_matrix((co.data[keep], co.indices[keep], indptr), shape=co.shape)
+
+    def _apply_like(self, likes: Iterable[int], movie_id: int, sign: int) -> None:
+        with self._delta_lock:
+            for other in set(likes):
+                if other == movie_id:
+                    continue
+                self._delta[movie_id][other] += sign
+                self._delta[other][movie_id] += sign
+            self._count_delta[movie_id] += sign
+
+    def add_like(self, likes_before: Iterable[int], movie_id: int) -> None:
+        """
+        Record that a user who already liked likes_before now also likes movie_id
+        """
+        self._apply_like(likes_before, movie_id, 1)
+
+    def remove_like(self, likes_after: Iterable[int], movie_id: int) -> None:
+        """
+        Record that a user who still likes likes_after no longer likes movie_id
+        """
+        self._apply_like(likes_after, movie_id, -1)
+
+    def _count(self, movie_id: int) -> int:
+        base = int(self.item_counts[movie_id]) if movie_id < self.item_counts.size else 0
+        return base + self._count_delta.get(movie_id, 0)
+
+    def _delta_scores(self, liked: set[int]) -> tuple[np.ndarray, np.ndarray]:
+        # 增量共现计数按当前点赞数做余弦归一化，和预计算的相似度直接相加
+        ids: list[int] = []
+        weights: list[float] = []
+        with self._delta_lock:
+            for i in liked:
+                row = self._delta.get(i)
+                if not row:
+                    continue
+                n_i = self._count(i)
+                for j, co in row.items():
+                    n_ij = n_i * self._count(j)
+                    if co and n_ij > 0:
+                        ids.append(j)
+                        weights.append(co / np.sqrt(n_ij))
+        return np.asarray(ids, dtype=np.int64), np.asarray(weights, dtype=np.float64)
+
+    def score(self, liked: Sequence[int]) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Return (candidate ids, scores) for a set of liked movie ids, seen movies excluded
+        """
+        liked_set = set(liked)
+        liked_arr = np.fromiter(liked_set, dtype=np.int64, count=len(liked_set))
+        known = liked_arr[(liked_arr >= 0) & (liked_arr < self.n_items)]
+
+        # 只取点赞电影对应的几行，累加邻居的相似度
+        rows = self.similarity[known]
+        delta_ids, delta_weights = self._delta_scores(liked_set)
+        all_ids = np.concatenate([rows.indices.astype(np.int64), delta_ids])
+        all_weights = np.concatenate([rows.data.astype(np.float64), delta_weights])
+        if all_ids.size == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float64)
+
+        candidates, inverse = np.unique(all_ids, return_inverse=True)
+        scores = np.bincount(inverse, weights=all_weights, minlength=candidates.size)
+        unseen = ~np.isin(candidates, liked_arr) & (scores > 0)
+        return candidates[unseen], scores[unseen]
+
+    def recommend(self, liked: Sequence[int], k: int = 10) -> list[int]:
+        """
+        Return the top-k unseen movie ids for a list of liked movie ids
+        """
+        candidates, scores = self.score(liked)
+        return top_k(candidates, scores, k)
+
+
+def build_cooccurrence_model(session: Session) -> CooccurrenceModel:
+    """
+    Build a model from every like array in the usermovie table
+    """
+    start = time.perf_counter()
+    statement = select(UserMovie.movies).execution_options(yield_per=10_000)
+    likes = session.exec(statement)
+    model = CooccurrenceModel(neighbors=settings.RECOMMENDER_NEIGHBORS).fit(likes)
+    logger.info(
+        "Co-occurrence model built: %d users, %d items, %d pairs in %.2fs",
+        model.n_users,
+        model.n_items,
+        model.similarity.nnz,
+        time.perf_counter() - start,
+    )
+    return model
+
+
+# 每个 worker 进程内共享一个模型实例，过期后在后台线程重建，重建期间继续使用旧模型
+_holder = ModelHolder(
+    "Co-occurrence model", build_cooccurrence_model, settings.RECOMMENDER_MAX_AGE_SECONDS
+)
+
+
+def get_cooccurrence_model(session: Session) -> CooccurrenceModel:
+    """
+    Return the process-wide model, building it on first use and refreshing it when stale
+    """
+    return _holder.get(session)
+
+
+def record_like(likes_before: Sequence[int], movie_id: int) -> None:
+    """
+    Fold a new like into this process's model without a rebuild
+    """
+    likes = list(likes_before)
+    _holder.update(lambda model: model.add_like(likes, movie_id))
+
+
+def record_unlike(likes_after: Sequence[int], movie_id: int) -> None:
+    """
+    Fold a removed like into this process's model without a rebuild
+    """
+    likes = list(likes_after)
+    _holder.update(lambda model: model.remove_like(likes, movie_id))
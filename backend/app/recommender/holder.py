@@ -0,0 +1,90 @@
+import logging
+import threading
+import time
+from collections.abc import Callable
+from typing import Generic, TypeVar
+
+from sqlmodel import Session
+
+from app.core.db import engine
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class ModelHolder(Generic[T]):
+    """
+    Process-wide holder for an in-memory model.
+
+    The model is built synchronously on first use; once older than max_age seconds
+    it is rebuilt in a background thread while requests keep using the old one.
+    Incremental updates applied during a rebuild are journaled and replayed onto
+    the new model before it is swapped in.
+    """
+
+    def __init__(self, name: str, build: Callable[[Session], T], max_age: float) -> None:
+        self.name = name
+        self.build = build
+        self.max_age = max_age
+        self._model: T | None = None
+        self._built_at = 0.0
+        self._lock = threading.Lock()
+        self._rebuilding = False
+        self._journal: list[Callable[[T], None]] = []
+
+    def _set(self, model: T) -> None:
+        self._model = model
+        self._built_at = time.time()
+
+    def _rebuild_in_background(self) -> None:
+        try:
+            with Session(engine) as session:
+                model = self.build(session)
+            with self._lock:
+                # 重建期间发生的增量更新不在新模型的数据快照里，需要重放一遍
+                for update in self._journal:
+                    update(model)
+                self._set(model)
+        except Exception:
+            logger.exception("%s rebuild failed", self.name)
+        finally:
+            with self._lock:
+                self._journal.clear()
+                self._rebuilding = False
+
+    def get(self, session: Session) -> T:
+        model = self._model
+        if model is None:
+            with self._lock:
+                if self._model is None:
+                    self._set(self.build(session))
+                model = self._model
+        elif time.time() - self._built_at > self.max_age:
+            with self._lock:
+                if not self._rebuilding:
+                    self._rebuilding = True
+                    threading.Thread(
+                        target=self._rebuild_in_background, daemon=True
+                    ).start()
+        assert model is not None
+        return model
+
+    def update(self, update: Callable[[T], None]) -> None:
+        """
+        Apply an incremental update to the current model, if one has been built
+        """
+        with self._lock:
+            if self._model is None:
+                # 还没有构建过模型，下次构建时会直接从数据库读到这次修改
+                return
+            update(self._model)
+            if self._rebuilding:
+                self._journal.append(update)
+
+    def set(self, model: T) -> None:
+        """
+        Replace the current model, e.g. after loading one from disk
+        """
+        with self._lock:
+            self._set(model)
@@ -0,0 +1,30 @@
+import numpy as np
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Return the positions of the k highest scores, best first, using a partial sort
+    """
+    if scores.size == 0 or k <= 0:
+        return np.zeros(0, dtype=np.int64)
+    if scores.size > k:
+        part = np.argpartition(-scores, k - 1)[:k]
+        return part[np.argsort(-scores[part], kind="stable")]
+    return np.argsort(-scores, kind="stable")
+
+
+def top_k(ids: np.ndarray, scores: np.ndarray, k: int) -> list[int]:
+    """
+    Return the ids with the k highest scores, best first
+    """
+    return [int(i) for i in ids[top_k_indices(scores, k)]]
+
+
+def top_k_rows(scores: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Row-wise top-k of a 2-D score matrix: (column indices, scores), best first
+    """
+    best = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    best_scores = np.take_along_axis(scores, best, axis=1)
+    order = np.argsort(-best_scores, axis=1, kind="stable")
+    return np.take_along_axis(best, order, axis=1), np.take_along_axis(best_scores, order, axis=1)
@@ -0,0 +1,28 @@
+"""
+从 usermovie 全量重新统计每部电影的点赞数和类型，修正增量更新可能产生的偏差。
+平时由点赞/取消点赞接口增量维护，这个脚本只需要低频运行（例如每天一次）。
+
+    python -m app.refresh_popularity
+"""
+import logging
+import time
+
+from sqlmodel import Session
+
+from app.core.db import engine
+from app.crud.popularity import refresh_like_counts
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main() -> None:
+    logger.info("Refreshing movie popularity")
+    start = time.perf_counter()
+    with Session(engine) as session:
+        refreshed = refresh_like_counts(session)
+    logger.info("Movie popularity refreshed: %d movies in %.2fs", refreshed, time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    main()
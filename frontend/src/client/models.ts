@@ -71,6 +71,13 @@ export type MoviePublicOut = {
 	website?: string | null;
 	id: number;
 	owner_id: number;
+	poster_key?: string | null;
+	year_num?: number | null;
+	runtime_num?: number | null;
+	imdb_rating_num?: number | null;
+	imdb_votes_num?: number | null;
+	metascore_num?: number | null;
+	box_office_num?: number | null;
 };
 
 
@@ -101,9 +108,62 @@ export type MovieUpdateIn = {
 
 
 
+export type FacetCountOut = {
+	name: string;
+	count: number;
+};
+
+
+
+export type MoviePartialOut = {
+	title?: string | null;
+	year?: string | null;
+	rated?: string | null;
+	released?: string | null;
+	runtime?: string | null;
+	genre?: string | null;
+	director?: string | null;
+	writer?: string | null;
+	actors?: string | null;
+	plot?: string | null;
+	language?: string | null;
+	country?: string | null;
+	awards?: string | null;
+	poster?: string | null;
+	imdb_rating?: string | null;
+	imdb_votes?: string | null;
+	imdb_id?: string | null;
+	metascore?: string | null;
+	box_office?: string | null;
+	production?: string | null;
+	website?: string | null;
+	id?: number | null;
+	owner_id?: number | null;
+	poster_key?: string | null;
+	year_num?: number | null;
+	runtime_num?: number | null;
+	imdb_rating_num?: number | null;
+	imdb_votes_num?: number | null;
+	metascore_num?: number | null;
+	box_office_num?: number | null;
+};
+
+
+
+export type MoviesPartialOut = {
+	data: Array<MoviePartialOut>;
+	count: number | null;
+	next_cursor?: string | null;
+	facets?: Record<string, Array<FacetCountOut>> | null;
+};
+
+
+
 export type MoviesPublicOut = {
 	data: Array<MoviePublicOut>;
-	count: number;
+	count: number | null;
+	next_cursor?: string | null;
+	facets?: Record<string, Array<FacetCountOut>> | null;
 };
 
 
@@ -195,7 +255,7 @@ export type UserUpdateMe = {
 
 export type UsersPublic = {
 	data: Array<UserPublic>;
-	count: number;
+	count: number | null;
 };
 
 
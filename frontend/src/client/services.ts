@@ -2,7 +2,7 @@ import type { CancelablePromise } from './core/CancelablePromise';
 import { OpenAPI } from './core/OpenAPI';
 import { request as __request } from './core/request';
 
-import type { Body_______login_login_access_token,Message,NewPassword,Token,UserPublic,UpdatePassword,UserCreate,UserRegister,UsersPublic,UserUpdate,UserUpdateMe,MovieCreateIn,MoviePublicOut,MoviesPublicOut,MovieUpdateIn,UserMovieCreateIn,UserMoviePublicOut,UserMovieUpdateIn } from './models';
+import type { Body_______login_login_access_token,Message,NewPassword,Token,UserPublic,UpdatePassword,UserCreate,UserRegister,UsersPublic,UserUpdate,UserUpdateMe,MovieCreateIn,MoviePublicOut,MoviesPartialOut,MoviesPublicOut,MovieUpdateIn,UserMovieCreateIn,UserMoviePublicOut,UserMovieUpdateIn } from './models';
 
 export type TDataLoginAccessToken = {
                 formData: Body_______login_login_access_token
@@ -366,7 +366,8 @@ userId,
 }
 
 export type TDataReadMovies = {
-                limit?: number
+                fields?: string | null
+limit?: number
 skip?: number
                 
             }
@@ -393,11 +394,12 @@ export class MoviesService {
 	/**
 	 * Read Movies
 	 * Retrieve Movies
-	 * @returns MoviesPublicOut Successful Response
+	 * @returns MoviesPublicOut | MoviesPartialOut Successful Response
 	 * @throws ApiError
 	 */
-	public static readMovies(data: TDataReadMovies = {}): CancelablePromise<MoviesPublicOut> {
+	public static readMovies(data: TDataReadMovies = {}): CancelablePromise<MoviesPublicOut | MoviesPartialOut> {
 		const {
+fields,
 limit = 100,
 skip = 0,
 } = data;
@@ -405,7 +407,7 @@ skip = 0,
 			method: 'GET',
 			url: '/api/v1/movies/',
 			query: {
-				skip, limit
+				skip, limit, fields
 			},
 			errors: {
 				422: `Validation Error`,
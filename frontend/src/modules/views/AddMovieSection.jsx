@@ -7,6 +7,7 @@ import MovieCard from '../components/MovieCard';
 import { fetchMovies } from '../../api/movieService'
 import { OpenAPI } from '../../client/core/OpenAPI';
 import {getToken} from '../../utils/loginToken'
+import { posterUrl } from '../../utils/poster'
 
  const AddMovieSection = () => {
     const [movies, setMovies] = useState([]); // state for movie data
@@ -47,7 +48,7 @@ import {getToken} from '../../utils/loginToken'
                     key={movie.id}
                     id={movie.id}
                     title={movie.title}
-                    imageUrl={movie.poster}
+                    imageUrl={posterUrl(movie)}
                     rating={movie.imdb_rating}
                     // onClick={() => alert(`${movie.title} clicked!`)} // 处理点击事件
                     />
@@ -12,6 +12,7 @@ import { fetchMovie } from '../api/movieService';
 import { addLikedMovie, removeLikedMovie, readLikedMovie } from '../api/userMovieService';
 import { OpenAPI } from '../client/core/OpenAPI';
 import {getToken} from '../utils/loginToken'
+import { posterUrl } from '../utils/poster'
 import AppAppBar from '../modules/views/AppAppBar';
 import withRoot from '../modules/withRoot';
 
@@ -79,7 +80,7 @@ function MovieDetail( ) {
           <CardMedia
             component="img"
             sx={{ width: { xs: '100%', md: 400 }, height: { xs: 'auto', md: 600 }, marginRight: 2 }}
-            image={movie.poster}
+            image={posterUrl(movie, 'large')}
             alt={movie.title}
           />
           <Box sx={{ display: 'flex', flexDirection: 'column' }}>
@@ -0,0 +1,11 @@
+//海报地址：有本地缩略图时从后端加载，否则回退到原始的外部地址
+
+import { OpenAPI } from '../client/core/OpenAPI';
+
+// size: "small" (185px) | "medium" (342px) | "large" (500px)
+export const posterUrl = (movie, size = 'medium') => {
+    if (movie.poster_key) {
+        return `${OpenAPI.BASE}/api/v1/posters/${movie.poster_key}/${size}`;
+    }
+    return movie.poster;
+}